@@ -1,16 +1,21 @@
 from kivy.app import App
 from kivy.uix.widget import Widget
-from kivy.graphics import Color, Rectangle
+from kivy.graphics import Color, InstructionGroup, PopMatrix, PushMatrix, Rectangle, Scale, Translate
 from kivy.core.window import Window
 from kivy.clock import Clock
 import random
 
+# The game runs in a fixed playfield; the canvas is scaled to fit whatever the window is
+logical_width, logical_height = 250, 450
+
 
 # Helper class to represent the platform and player objects
 class Platform:
     def __init__(self, x, y, width, height, color):
         self.rect = [x, y, width, height]
         self.color = color
+        self.group = None  # Canvas instructions, created once when the platform is shown
+        self.rectangle = None
 
 class MovingPlatform(Platform):
     def __init__(self, x, y, width, height):
@@ -20,7 +25,7 @@ class MovingPlatform(Platform):
 
     def update(self):
         self.rect[0] += self.direction * self.speed
-        if self.rect[0] <= 0 or self.rect[0] + self.rect[2] >= Window.width:
+        if self.rect[0] <= 0 or self.rect[0] + self.rect[2] >= logical_width:
             self.direction *= -1
 
 class BreakablePlatform(Platform):
@@ -54,15 +59,45 @@ class GameWidget(Widget):
         self.platforms = []
         self.player = None
         self.scroll_amount = 0
+
+        # Retained canvas: instructions are built once and only their positions change per frame
+        with self.canvas.before:
+            PushMatrix()
+            self.view_offset = Translate(0, 0)
+            self.view_scale = Scale(1, 1, 1)
+        with self.canvas.after:
+            PopMatrix()
+        with self.canvas:
+            Color(0, 1, 1)  # Cyan background
+            self.background = Rectangle(pos=(0, 0), size=(logical_width, logical_height))
+            Color(0, 1, 0)  # Green
+            self.player_rectangle = Rectangle(size=(self.player_size, self.player_size))
+        self.platform_layer = InstructionGroup()
+        self.canvas.add(self.platform_layer)
+
         self.generate_initial_platforms()
         self.create_player()
         Clock.schedule_interval(self.update, 1 / 60.0)
 
     def generate_initial_platforms(self):
-        self.platforms = self.generate_platforms(Window.width, Window.height, self.initial_platform_count)
+        for platform in self.platforms:
+            self.retire_platform(platform)
+        self.platforms = self.generate_platforms(logical_width, logical_height, self.initial_platform_count)
+        for platform in self.platforms:
+            self.show_platform(platform)
+
+    def show_platform(self, platform):
+        platform.group = InstructionGroup()
+        platform.group.add(Color(*platform.color))
+        platform.rectangle = Rectangle(pos=(platform.rect[0], platform.rect[1]), size=(platform.rect[2], platform.rect[3]))
+        platform.group.add(platform.rectangle)
+        self.platform_layer.add(platform.group)
+
+    def retire_platform(self, platform):
+        self.platform_layer.remove(platform.group)
 
     def create_player(self):
-        player_x = random.randint(0, Window.width - self.player_size)
+        player_x = random.randint(0, logical_width - self.player_size)
         player_y = self.place_player_on_platform(self.platforms, player_x)
         self.player = Player(player_x, player_y, self.player_size)
 
@@ -130,22 +165,26 @@ class GameWidget(Widget):
 
     def place_player_on_platform(self, platforms, player_x):
         for platform in platforms:
-            if platform.rect[1] < Window.height // 4 and platform.rect[0] <= player_x <= platform.rect[0] + self.platform_width:
+            if platform.rect[1] < logical_height // 4 and platform.rect[0] <= player_x <= platform.rect[0] + self.platform_width:
                 return platform.rect[1] - self.player_size
-        return Window.height // 4 - self.player_size
+        return logical_height // 4 - self.player_size
 
     def on_size(self, *args):
-        self.generate_initial_platforms()
-        self.create_player()
+        # Resizing or rotating only changes the transform; the run carries on
+        scale = min(Window.width / logical_width, Window.height / logical_height)
+        self.view_scale.x = scale
+        self.view_scale.y = scale
+        self.view_offset.x = (Window.width - logical_width * scale) / 2
+        self.view_offset.y = (Window.height - logical_height * scale) / 2
 
     def on_touch_down(self, touch):
-        if touch.x < Window.width / 2:
+        if touch.x < Window.width / 2:  # Touches arrive in window coordinates
             self.player.rect[0] -= 5
             if self.player.rect[0] < -self.player_size:
-                self.player.rect[0] = Window.width
+                self.player.rect[0] = logical_width
         else:
             self.player.rect[0] += 5
-            if self.player.rect[0] > Window.width:
+            if self.player.rect[0] > logical_width:
                 self.player.rect[0] = -self.player_size
 
     def update(self, dt):
@@ -165,6 +204,7 @@ class GameWidget(Widget):
 
                 if isinstance(platform, BreakablePlatform):
                     self.platforms.remove(platform)
+                    self.retire_platform(platform)
 
                 if isinstance(platform, SpikePlatform):
                     self.stop_game()  # End the game on hitting a spike
@@ -178,32 +218,28 @@ class GameWidget(Widget):
         if not hit_platform:
             self.jump_strength = self.base_jump_strength
 
-        if self.player.rect[1] < Window.height // 4:
-            self.scroll_amount = Window.height // 4 - self.player.rect[1]
-            self.player.rect[1] = Window.height // 4
+        if self.player.rect[1] < logical_height // 4:
+            self.scroll_amount = logical_height // 4 - self.player.rect[1]
+            self.player.rect[1] = logical_height // 4
             for platform in self.platforms:
                 platform.rect[1] += self.scroll_amount
+                if platform.rect[1] < 0:
+                    self.retire_platform(platform)
 
             self.platforms = [p for p in self.platforms if p.rect[1] >= 0]
 
-        if self.player.rect[1] >= Window.height - self.player_size:
+        if self.player.rect[1] >= logical_height - self.player_size:
             self.stop_game()
 
-        self.canvas.clear()
-        with self.canvas:
-            Color(0, 1, 1)  # Cyan background
-            Rectangle(pos=(0, 0), size=Window.size)
-            self.draw_player()
-            self.draw_platforms()
+        self.draw_player()
+        self.draw_platforms()
 
     def draw_player(self):
-        Color(0, 1, 0)  # Green
-        Rectangle(pos=(self.player.rect[0], self.player.rect[1]), size=(self.player.rect[2], self.player.rect[3]))
+        self.player_rectangle.pos = (self.player.rect[0], self.player.rect[1])
 
     def draw_platforms(self):
         for platform in self.platforms:
-            Color(*platform.color)
-            Rectangle(pos=(platform.rect[0], platform.rect[1]), size=(platform.rect[2], platform.rect[3]))
+            platform.rectangle.pos = (platform.rect[0], platform.rect[1])
 
     def collide(self, rect1, rect2):
         return (rect1[0] < rect2[0] + rect2[2] and rect1[0] + rect1[2] > rect2[0] and
@@ -215,7 +251,7 @@ class GameWidget(Widget):
 
 class DoodleJumpApp(App):
     def build(self):
-        Window.size = (250, 450)
+        Window.size = (logical_width, logical_height)
         game = GameWidget()
         Window.bind(on_resize=game.on_size)
         return game
@@ -0,0 +1,37 @@
+import pygame
+
+import assets
+
+rise_stretch = 1.2  # Rising frames are drawn this much taller, stretched up from the feet
+
+
+def stretch(frame, factor):
+    # Same canvas size, sprite scaled vertically about its feet so landing lines up with the base frame
+    bounds = frame.get_bounding_rect()
+    sprite = pygame.transform.scale(frame.subsurface(bounds), (bounds.width, round(bounds.height * factor)))
+    stretched = pygame.Surface(frame.get_size(), pygame.SRCALPHA).convert_alpha()
+    stretched.blit(sprite, (bounds.x, bounds.bottom - sprite.get_height()))
+    return stretched
+
+
+class PlayerAnimation:
+    # Every frame and its mask is built once here; update() only switches between them
+    def __init__(self):
+        right_frame, left_frame = assets.player_frames()
+        self.frames = {}  # (facing, rising) -> (image, mask)
+        for facing, frame in (('Right', right_frame), ('Left', left_frame)):
+            frame = frame.convert_alpha()
+            rising_frame = stretch(frame, rise_stretch)
+            self.frames[facing, False] = (frame, pygame.mask.from_surface(frame))
+            self.frames[facing, True] = (rising_frame, pygame.mask.from_surface(rising_frame))
+        self.facing = 'Right'
+        self.rising = False
+        self.image, self.mask = self.frames[self.facing, self.rising]
+
+    def update(self, facing, dy):
+        # The mask always belongs to the image that gets drawn, so collisions match what is on screen
+        rising = dy < 0
+        if facing != self.facing or rising != self.rising:
+            self.facing = facing
+            self.rising = rising
+            self.image, self.mask = self.frames[facing, rising]
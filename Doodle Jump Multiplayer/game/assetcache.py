@@ -0,0 +1,160 @@
+import json
+import mmap
+import os
+import struct
+import sys
+
+import pygame
+
+# Pre-decoded images: raw pixels already in the display's layout plus the collision masks,
+# so a launch maps one file instead of decoding every PNG. Build it with
+#     python assetcache.py
+# Entries whose source file changed since the build (by modification time and size) are ignored
+# and decoded as usual.
+cache_file = 'assets.cache'
+magic = b'DJASSET1'
+index_length = struct.Struct('<I')
+mask_run = struct.Struct('<HHH')  # x, y, length of one horizontal run of set bits
+alignment = 16
+
+_cache = None
+
+
+def file_stamp(path):
+    # One stat call; hashing every PNG on launch would cost more than decoding them
+    stat = os.stat(path)
+    return [stat.st_mtime_ns, stat.st_size]
+
+
+def pixel_format(surface):
+    # Byte order of a 32-bit surface's pixels, as understood by pygame.image.tobytes/frombuffer
+    order = ['A'] * 4  # Opaque surfaces leave the alpha byte unused; it is stored as 255
+    for name, mask in zip('RGB', surface.get_masks()):
+        order[(mask.bit_length() - 1) // 8] = name
+    if sys.byteorder == 'big':
+        order.reverse()
+    order = ''.join(order)
+    return order if order in ('RGBA', 'BGRA', 'ARGB') else 'RGBA'
+
+
+def mask_runs(mask):
+    width, height = mask.get_size()
+    runs = []
+    for y in range(height):
+        x = 0
+        while x < width:
+            if mask.get_at((x, y)):
+                start = x
+                while x < width and mask.get_at((x, y)):
+                    x += 1
+                runs.append(mask_run.pack(start, y, x - start))
+            else:
+                x += 1
+    return b''.join(runs)
+
+
+def build(images, path=cache_file):
+    # images: source path -> True for images with a collision mask, False for opaque backgrounds.
+    # Needs a display so convert/convert_alpha can pick the screen's pixel format.
+    index = {}
+    blobs = []
+    offset = 0
+    for source, with_mask in images.items():
+        surface = pygame.image.load(source)
+        surface = surface.convert_alpha() if with_mask else surface.convert()
+        layout = pixel_format(surface)
+        pixels = pygame.image.tobytes(surface, layout)
+        runs = mask_runs(pygame.mask.from_surface(surface)) if with_mask else b''
+        index[source] = {
+            'stamp': file_stamp(source),
+            'size': surface.get_size(),
+            'format': layout,
+            'opaque': not with_mask,
+            'pixels': [offset, len(pixels)],
+            'mask': [offset + len(pixels), len(runs)] if with_mask else None,
+        }
+        blob = pixels + runs
+        blob += bytes(-len(blob) % alignment)
+        blobs.append(blob)
+        offset += len(blob)
+
+    header = json.dumps(index).encode()
+    header += b' ' * (-(len(magic) + index_length.size + len(header)) % alignment)
+    data_start = len(magic) + index_length.size + len(header)
+    temporary = path + '.tmp'
+    with open(temporary, 'wb') as f:
+        f.write(magic)
+        f.write(index_length.pack(len(header)))
+        f.write(header)
+        for blob in blobs:
+            f.write(blob)
+    os.replace(temporary, path)  # Running games keep their old mapping
+    print(f"Wrote {path}: {len(index)} images, {data_start + offset} bytes")
+
+
+class AssetCache:
+    def __init__(self, path=cache_file):
+        self.file = open(path, 'rb')
+        self.data = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ)
+        if self.data[:len(magic)] != magic:
+            raise ValueError(f"{path} is not an asset cache")
+        start = len(magic) + index_length.size
+        length = index_length.unpack_from(self.data, len(magic))[0]
+        self.index = json.loads(self.data[start:start + length])
+        self.data_start = start + length
+        self.view = memoryview(self.data)
+        self.run_masks = {}  # run length -> 1-pixel-high filled mask
+
+    def load(self, source):
+        # (image, mask) straight from the mapping, or None when missing or out of date
+        entry = self.index.get(source)
+        if entry is None:
+            return None
+        try:
+            if file_stamp(source) != entry.get('stamp'):
+                return None
+        except OSError:
+            pass  # Source not shipped; the cached copy is all there is
+        offset, length = entry['pixels']
+        offset += self.data_start
+        # frombuffer shares the mapped bytes, so the mapping stays open for the whole run
+        image = pygame.image.frombuffer(self.view[offset:offset + length], entry['size'], entry['format'])
+        if entry['opaque']:
+            return image.convert(), None
+        if image.get_masks()[:3] != pygame.display.get_surface().get_masks()[:3]:
+            image = image.convert_alpha()  # Built on a display with another layout
+        return image, self.read_mask(entry)
+
+    def read_mask(self, entry):
+        offset, length = entry['mask']
+        offset += self.data_start
+        mask = pygame.mask.Mask(entry['size'])
+        for x, y, run_length in mask_run.iter_unpack(self.view[offset:offset + length]):
+            run = self.run_masks.get(run_length)
+            if run is None:
+                run = self.run_masks[run_length] = pygame.mask.Mask((run_length, 1), fill=True)
+            mask.draw(run, (x, y))
+        return mask
+
+
+def get_cache():
+    # None when there is no usable cache file; callers then decode the PNGs
+    global _cache
+    if _cache is None:
+        try:
+            _cache = AssetCache()
+        except FileNotFoundError:
+            _cache = False  # Never built; decoding the PNGs is the normal case
+        except (OSError, ValueError) as e:
+            print(f"Asset cache not used: {e}")
+            _cache = False
+    return _cache or None
+
+
+if __name__ == "__main__":
+    import assets
+
+    pygame.display.init()
+    pygame.display.set_mode((1, 1), pygame.HIDDEN)
+    build(assets.cached_images())
+    pygame.quit()
@@ -0,0 +1,73 @@
+import pygame
+
+import assetcache
+import platform_types
+
+# Images are loaded the first time they are asked for, after the window exists
+# (convert_alpha needs a display), and kept for the rest of the run.
+platform_files = {platform_type.name: platform_type.sprite for platform_type in platform_types.types}
+player_file = 'Doodler5.png'
+spritesheet_file = 'Doodler56.png'
+background_file = 'background.png'
+
+fwidth = 55
+fheight = 55
+
+_images = {}
+
+
+# Load images and masks
+def load_image_with_mask(image_path):
+    try:
+        image = pygame.image.load(image_path).convert_alpha()
+        mask = pygame.mask.from_surface(image)
+        print(f"Loaded image: {image_path}")
+        return image, mask
+    except pygame.error as e:
+        print(f"Cannot load image: {image_path} - {e}")
+        return None, None
+
+
+def image_with_mask(image_path):
+    if image_path not in _images:
+        cache = assetcache.get_cache()
+        cached = cache.load(image_path) if cache else None
+        _images[image_path] = cached or load_image_with_mask(image_path)
+    return _images[image_path]
+
+
+def player_image():
+    return image_with_mask(player_file)
+
+
+def platform_image(platform_type):
+    return image_with_mask(platform_files[platform_type])
+
+
+def background_image():
+    if background_file not in _images:
+        cache = assetcache.get_cache()
+        cached = cache.load(background_file) if cache else None
+        _images[background_file] = cached[0] if cached else pygame.image.load(background_file).convert()
+    return _images[background_file]
+
+
+def player_frames():
+    # (right_frame, left_frame) sliced from the spritesheet
+    if spritesheet_file not in _images:
+        cache = assetcache.get_cache()
+        cached = cache.load(spritesheet_file) if cache else None
+        spritesheet = cached[0] if cached else pygame.image.load(spritesheet_file)
+        right_frame = spritesheet.subsurface(pygame.Rect(0, 0, fwidth, fheight))  # First frame (right orientation)
+        left_frame = spritesheet.subsurface(pygame.Rect(fwidth, 0, fwidth, fheight))  # Second frame (left orientation)
+        _images[spritesheet_file] = (right_frame, left_frame)
+    return _images[spritesheet_file]
+
+
+def cached_images():
+    # What assetcache.py pre-decodes: source path -> whether it needs a collision mask
+    images = {path: True for path in platform_files.values()}
+    images[player_file] = True
+    images[spritesheet_file] = True  # Needs alpha; the cache keeps alpha only for masked images
+    images[background_file] = False
+    return images
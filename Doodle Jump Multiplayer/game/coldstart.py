@@ -0,0 +1,53 @@
+import os
+import subprocess
+import sys
+
+# Cold-start check: imports each game module in a fresh interpreter and reports how long it took
+# and whether the import opened a window. Importing must only define things; pygame itself is
+# the floor, everything above it is the module's own import cost.
+modules = ['assets', 'assetcache', 'persistence', 'leaderboard', 'session', 'main', 'debug', 'newproto7', 'client', 'newplayer']
+runs = 5
+target_overhead_ms = 20  # Allowed import time on top of pygame's own
+
+probe = """
+import time
+started = time.perf_counter()
+import {module}
+elapsed = time.perf_counter() - started
+import pygame
+print(elapsed * 1000, int(pygame.display.get_surface() is not None))
+"""
+
+
+def time_import(module):
+    # Best of several runs; the first one also pays for disk cache misses
+    env = dict(os.environ, SDL_VIDEODRIVER='dummy', PYGAME_HIDE_SUPPORT_PROMPT='1')
+    best = None
+    opened_window = False
+    for _ in range(runs):
+        output = subprocess.run(
+            [sys.executable, '-c', probe.format(module=module)],
+            capture_output=True, text=True, env=env, check=True
+        ).stdout.split()
+        elapsed, window = float(output[-2]), output[-1] == '1'
+        best = elapsed if best is None else min(best, elapsed)
+        opened_window = opened_window or window
+    return best, opened_window
+
+
+def main():
+    baseline, _ = time_import('pygame')
+    print(f"{'pygame':12} {baseline:8.1f} ms  (baseline)")
+    failed = False
+    for module in modules:
+        elapsed, opened_window = time_import(module)
+        overhead = max(0.0, elapsed - baseline)  # Modules without pygame come in under the floor
+        ok = overhead <= target_overhead_ms and not opened_window
+        failed = failed or not ok
+        note = "opened a window" if opened_window else f"+{overhead:.1f} ms"
+        print(f"{module:12} {elapsed:8.1f} ms  {note:18} {'ok' if ok else 'SLOW'}")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -2,46 +2,19 @@ import pygame
 import random
 import os
 
-# Initialize Pygame
-pygame.init()
-pygame.font.init()
-
-screen = pygame.display.set_mode((800, 600))
-
-
-
-# Load images and masks
-def load_image_with_mask(image_path):
-    try:
-        image = pygame.image.load(image_path).convert_alpha()
-        mask = pygame.mask.from_surface(image)
-        print(f"Loaded image: {image_path}")
-        return image, mask
-    except pygame.error as e:
-        print(f"Cannot load image: {image_path} - {e}")
-        return None, None
-
-# Load player and platform images
-player_image, player_mask = load_image_with_mask('Doodler5.png')
-spritesheet = pygame.image.load("Doodler56.png")
-
-fwidth = 55
-fheight = 55
-
-right_frame = spritesheet.subsurface(pygame.Rect(0, 0, fwidth, fheight))  # First frame (right orientation)
-left_frame = spritesheet.subsurface(pygame.Rect(fwidth, 0, fwidth, fheight))  # Second frame (left orientation)
-
-
-platform_images = {
-    'normal': load_image_with_mask('PlatNorm.png'),
-    'breakable': load_image_with_mask('BreakPlat.png'),
-    'fly': load_image_with_mask('FlyPlat.png'),
-    'moving': load_image_with_mask('MovePlat.png'),
-    'danger': load_image_with_mask('DangerPlat.png'),
-    'superJump': load_image_with_mask('SuperJumpPlat.png')
-}
-
-background_image = pygame.image.load('background.png').convert()
+import assets
+import levelgen
+import physics
+import platform_types
+import reachability
+import renderqueue
+import strips
+from animation import PlayerAnimation
+from persistence import get_persistence
+from pools import PlatformPool
+from renderqueue import RenderQueue
+from strips import StripCache
+from viewport import Viewport, window_exposed
 
 # Constants
 width, height = 250, 450
@@ -53,99 +26,124 @@ gravity = 0.2
 jump_strength = 9
 super_jump_strength = jump_strength * 2
 fly_duration = 5000  # Duration of fly effect in milliseconds
+player_name = os.environ.get('DOODLE_PLAYER', 'player')  # Leaderboard entry name
+show_stats = os.environ.get('DOODLE_STATS') == '1'  # Print pool, strip cache and render queue stats on exit
+background_top = 100  # Screen y of the background image
 
-# Initialize font
-font = pygame.font.SysFont(None, 24)
+font = None  # Created in main(); SysFont needs pygame initialised
+_screens = {}  # Start and game-over screens, rendered on first use
+_hud = {}  # HUD slot -> (value, rendered text)
 
 # Functions
+def hud_text(slot, value, template="{}"):
+    # Text is rendered again only when its value changes, not every frame
+    cached = _hud.get(slot)
+    if cached is None or cached[0] != value:
+        cached = _hud[slot] = (value, font.render(template.format(value), True, (0, 0, 0)))
+    return cached[1]
+
 def draw_screen(win):
-    win.fill((0,255,0))
-    buttonSize = 150
-    buttonColor = (0,255,0)
-    buttonRect = pygame.Rect((width-buttonSize)//2,(height-buttonSize)//2,buttonSize,buttonSize)
-    pygame.draw.rect(win,buttonColor,buttonRect)
+    # The start screen never changes, so it is rendered once and only blitted after that
+    if 'start' not in _screens:
+        screen = pygame.Surface((width,height)).convert()
+        screen.fill((0,255,0))
+        buttonSize = 150
+        buttonColor = (0,255,0)
+        buttonRect = pygame.Rect((width-buttonSize)//2,(height-buttonSize)//2,buttonSize,buttonSize)
+        pygame.draw.rect(screen,buttonColor,buttonRect)
+
+        draw_Start = font.render('Start',True,(0,0,0))
+        draw_Start_rect = draw_Start.get_rect(center = buttonRect.center)
+        screen.blit(draw_Start,draw_Start_rect)
+        _screens['start'] = (screen, buttonRect)
+
+    screen, buttonRect = _screens['start']
+    win.blit(screen,(0,0))
+    viewport.present()
+    return buttonRect
 
-    draw_Start = font.render('Start',True,(0,0,0))
-    draw_Start_rect = draw_Start.get_rect(center = buttonRect.center)
-    win.blit(draw_Start,draw_Start_rect)
+def draw_game_over(win, background_image):
+    # Background and messages over the last frame of the run, built once and reused every game over
+    if 'game_over' not in _screens:
+        screen = background_image.copy()
+        game_over_surface = font.render("Game Over", True, (0, 0, 0))
+        game_over_rect = game_over_surface.get_rect(center=(width // 2, height // 2 - background_top))
+        screen.blit(game_over_surface, game_over_rect)
 
-    pygame.display.flip()
-    return buttonRect
+        continue_surface = font.render("Press Space to Continue", True, (0, 0, 0))
+        continue_rect = continue_surface.get_rect(center=(width // 2, height // 2 + 20 - background_top))
+        screen.blit(continue_surface, continue_rect)
+        _screens['game_over'] = screen
+
+    win.blit(_screens['game_over'], (0, background_top))
+    viewport.present()
+
+def wait_events():
+    # Sleeps until at least one event arrives, then returns it with anything else already queued
+    return [pygame.event.wait()] + pygame.event.get()
 
 def create_window(width, height):
-    win = pygame.display.set_mode((width, height), pygame.RESIZABLE)
+    # Returns the fixed-size playfield surface; the viewport scales it to whatever size the window is
+    global viewport
+    viewport = Viewport((width, height))
+    win = viewport.surface
     win.fill((0, 255, 255))  # Cyan background
     pygame.display.set_caption("Doodle Jump")
     return win
 
-def draw_player(win, player_rect):
-    win.blit(player_image, player_rect)  # Draw player image
+def compose_backdrop(background_image):
+    # The fill and the background image never scroll, so they are flattened into one surface
+    backdrop = pygame.Surface((width, height)).convert()
+    backdrop.fill((0, 255, 255))
+    backdrop.blit(background_image, (0, background_top))
+    return backdrop
 
-def draw_platforms(win, platforms):
+def draw_player(queue, player_rect):
+    queue.add(player_animation.image, player_rect, renderqueue.PLAYER)  # Draw the current animation frame
+
+def draw_platforms(queue, platforms):
     for platform in platforms:
-        win.blit(platform.image, platform.rect)  # Draw platform image
+        if not strips.is_static(platform):  # Static platforms are already in the strip cache
+            queue.add(platform.image, platform.rect, renderqueue.SPRITES)  # Draw platform image
 
 def generate_platforms(grid_width, grid_height, cell_size, num_platforms, y_offset=0):
+    # Positions and types are sampled by levelgen in one batch; only the Platform objects are built here
     platforms = []
-    available_x_positions = list(range(0, grid_width, cell_size * 15))  # Ensure horizontal spacing
-    random.shuffle(available_x_positions)  # Shuffle to randomize
-
-    y = y_offset
-    rows_with_moving_platforms = set()  # To keep track of rows with moving platforms
-    vertical_spacing = cell_size * 8  # Increased vertical spacing between platforms
-
-    while y < grid_height + y_offset and len(platforms) < num_platforms:
-        row_x_positions = available_x_positions.copy()  # Copy x positions for this row
-        random.shuffle(row_x_positions)  # Shuffle to randomize
-
-        # Chance to place a moving platform
-        if random.random() < 0.2:  # 20% chance to place a moving platform
-            moving_platform_x = row_x_positions.pop()
-            moving_platform = Platform(
-                pygame.Rect(
-                    moving_platform_x,
-                    y,
-                    platform_width,
-                    platform_height
-                ),
-                'moving'
-            )
-            platforms.append(moving_platform)
-            rows_with_moving_platforms.add(y)  # Mark this row as containing a moving platform
-
-        # Place other platforms
-        for x in row_x_positions:
-            if len(platforms) >= num_platforms:
-                break
-            if random.random() < 0.5 and y not in rows_with_moving_platforms:  # 50% chance to place a platform
-                platform_type = random.choices(
-                    ['normal', 'breakable', 'fly', 'superJump', 'danger'],
-                    [0.60, 0.10, 0.07, 0.5, 0.05]  # Adjusted to ensure superJump is included
-                )[0]
-                platform = Platform(
-                    pygame.Rect(
-                        x,
-                        y,
-                        platform_width,
-                        platform_height
-                    ),
-                    platform_type
-                )
-                platforms.append(platform)
-        y += vertical_spacing  # Increased vertical spacing
-
+    for x, y, type_id in levelgen.generate_layout(
+        grid_width, grid_height, cell_size, num_platforms, y_offset, platform_width=platform_width
+    ):
+        platforms.append(platform_pool.acquire(x, y, platform_width, platform_height, type_id))
     return platforms
 
 
 class Platform:
-    def __init__(self, rect, platform_type):
+    def __init__(self, rect, type_id):
         self.rect = rect
-        self.platform_type = platform_type
-        self.image, self.mask = platform_images[platform_type]
+        self.reset(type_id)
+
+    def reset(self, type_id):
+        # Also how the pool turns a retired platform into a new spawn; the rect is already placed
+        kind = platform_types.types[type_id]
+        self.type_id = type_id
+        self.platform_type = kind.name
+        self.image, self.mask = assets.platform_image(kind.name)
         self.scored = False  # Track if the platform has been scored
-        if platform_type == 'moving':
-            self.direction = random.choice([-1, 1])  # Start moving left or right randomly
-            self.speed = 2  # Speed of the moving platform
+        if kind.on_spawn is not None:
+            kind.on_spawn(self)
+
+platform_pool = PlatformPool(Platform)
+
+def cull_platforms(platforms):
+    # Drops platforms that scrolled off the bottom of the screen, in place, and hands them back to the pool
+    kept = 0
+    for platform in platforms:
+        if platform.rect.top < height:
+            platforms[kept] = platform
+            kept += 1
+        else:
+            strip_cache.invalidate(platform)
+            platform_pool.release(platform)
+    del platforms[kept:]
 
 def check_collision(rect1, mask1, rect2, mask2):
     offset = (rect2.left - rect1.left, rect2.top - rect1.top)
@@ -165,19 +163,19 @@ def reset_game():
     fly_end_time = 0
     score = 0
     game_over = False
+    platform_pool.release_all(platforms)
     platforms = generate_platforms(width, height, cell_size, initial_platform_count)
+    strip_cache.clear()
 
 # Load highscore
 def load_highscore():
-    if os.path.isfile('highscore.txt'):
-        with open('highscore.txt', 'r') as file:
-            return int(file.read().strip())
-    return 0
+    return get_persistence().best()
 
 # Save highscore
 def save_highscore(new_highscore):
-    with open('highscore.txt', 'w') as file:
-        file.write(str(new_highscore))
+    # Queued for the background writer; the frame loop never waits on disk
+    get_persistence().submit_score(player_name, new_highscore)
+    get_persistence().submit_stat('runs')
 
 def place_player_on_platform(platforms, player_rect):
     for platform in platforms:
@@ -199,192 +197,223 @@ game_over = False
 super_jump_count = 0
 super_jump_strength = jump_strength * 2
 using_super_jump = False
-highscore = load_highscore()
-window = create_window(width, height)
-platforms = generate_platforms(width, height, cell_size, initial_platform_count)
-
-# Game loop
-clock = pygame.time.Clock()
-running = True
-
-start_screen = True
-startButton_rect = None 
-
-while running:
-    for event in pygame.event.get():
-        if event.type == pygame.QUIT:
-            running = False
-        elif event.type == pygame.KEYDOWN:
-            if event.key == pygame.K_SPACE:
-                if game_over:
-                    reset_game()
-                elif super_jump_count > 0:
-                    using_super_jump = True
-                    super_jump_count -= 1
-            if event.key == pygame.K_ESCAPE:
+highscore = 0
+window = None
+viewport = None
+player_animation = None  # Built in main() once the display exists
+strip_cache = None
+render_queue = None
+platforms = []
+
+
+def main():
+    global player_dy, orient_Player, flying, fly_end_time, score, game_over, super_jump_count, using_super_jump
+    global platforms, highscore, window, font, player_animation, strip_cache, render_queue
+
+    # Window, font, images and the score store are only set up when the game actually runs
+    pygame.init()
+    pygame.font.init()
+    font = pygame.font.SysFont(None, 24)
+    window = create_window(width, height)
+    highscore = load_highscore()
+    platforms = generate_platforms(width, height, cell_size, initial_platform_count)
+    player_animation = PlayerAnimation()
+    physics.prepare(
+        [mask for image, mask in player_animation.frames.values()],
+        [assets.platform_image(platform_type)[1] for platform_type in assets.platform_files]
+    )
+    background_image = assets.background_image()
+    strip_cache = StripCache((width, height), compose_backdrop(background_image))
+    render_queue = RenderQueue(window)  # Everything drawn in a frame goes out in one blits call
+
+    # Game loop
+    clock = pygame.time.Clock()
+    platforms_to_remove = []  # Reused every frame
+    running = True
+
+    start_screen = True
+    startButton_rect = None
+    game_over_shown = False  # The game-over screen is up and nothing will change until there is input
+
+    while running:
+        # Idle screens block here instead of redrawing an unchanged frame 60 times a second
+        for event in wait_events() if game_over_shown else pygame.event.get():
+            if event.type == pygame.QUIT:
                 running = False
-    if start_screen:
-        draw_screen(window)
-        startButton_rect = draw_screen(window)
-
-        while start_screen:
-            for event in pygame.event.get():
+            elif event.type == pygame.KEYDOWN:
+                if event.key == pygame.K_SPACE:
+                    if game_over:
+                        reset_game()
+                        game_over_shown = False
+                    elif super_jump_count > 0:
+                        using_super_jump = True
+                        super_jump_count -= 1
+                if event.key == pygame.K_ESCAPE:
+                    running = False
+            elif event.type == pygame.VIDEORESIZE:
+                viewport.resize(event.size)
+                viewport.present()  # An idle screen is not redrawn, so repaint it at the new size now
+            elif event.type == window_exposed:
+                viewport.present()
+        if start_screen:
+            startButton_rect = draw_screen(window)
+
+            while start_screen:
+                event = pygame.event.wait()  # Nothing on the start screen moves; sleep until there is input
                 if event.type == pygame.QUIT:
                     running = False
                     start_screen = False
                 elif event.type == pygame.MOUSEBUTTONDOWN:
-                    mousePos = pygame.mouse.get_pos()
+                    mousePos = viewport.to_logical(event.pos)
                     if startButton_rect.collidepoint(mousePos):
                         start_screen = False
                         reset_game()
                 elif event.type == pygame.KEYDOWN:
-                    if event.type == pygame.K_ESCAPE:
+                    if event.key == pygame.K_ESCAPE:
                         running = False
                         start_screen = False
-
-    if game_over:
-        window.blit(background_image,(0,100))
-        game_over_text = "Game Over"
-        game_over_surface = font.render(game_over_text, True, (0, 0, 0))
-        game_over_rect = game_over_surface.get_rect(center=(width // 2, height // 2))
-        window.blit(game_over_surface, game_over_rect,)
-
-        continue_text = "Press Space to Continue"
-        continue_surface = font.render(continue_text, True, (0, 0, 0))
-        continue_rect = continue_surface.get_rect(center=(width // 2, height // 2 + 20))
-        window.blit(continue_surface, continue_rect)
- 
-        pygame.display.flip()
-        clock.tick(60)
-        continue
-
-    keys = pygame.key.get_pressed()
-    if not game_over:
-        if keys[pygame.K_LEFT]:
-            player_rect.x -= 3
-            if player_rect.left < -player_rect.width:
+                elif event.type == pygame.VIDEORESIZE:
+                    viewport.resize(event.size)
+                    viewport.present()
+                elif event.type == window_exposed:
+                    viewport.present()
+
+        if game_over:
+            if not game_over_shown:
+                draw_game_over(window, background_image)
+                game_over_shown = True
+            continue
+
+        keys = pygame.key.get_pressed()
+        if not game_over:
+            if keys[pygame.K_LEFT]:
+                player_rect.x -= 3
                 orient_Player = 'Left'
-                print(f"direction:{orient_Player}")
-                player_rect.right = width
-        if keys[pygame.K_RIGHT]:
-            player_rect.x += 3
-            if player_rect.right > width:
-                player_rect.left = -player_rect.width
-
-    current_time = pygame.time.get_ticks()
-    if flying:
-        if current_time < fly_end_time:
-            player_rect.y -= 5  # Move player upwards while flying
-        else:
-            flying = False
-            player_dy = gravity  # Resume normal gravity
+                if player_rect.left < -player_rect.width:
+                    player_rect.right = width
+            if keys[pygame.K_RIGHT]:
+                player_rect.x += 3
+                orient_Player = 'Right'
+                if player_rect.right > width:
+                    player_rect.left = -player_rect.width
+
+        previous_y = player_rect.y  # Start of this frame's landing sweep
+        current_time = pygame.time.get_ticks()
+        if flying:
+            if current_time < fly_end_time:
+                player_rect.y -= 5  # Move player upwards while flying
+            else:
+                flying = False
+                player_dy = gravity  # Resume normal gravity
+
+        if not flying:
+            player_dy += gravity
+            player_rect.y += player_dy
+
+        if using_super_jump:
+            # Ensure the super jump only affects the next jump
+            player_dy = -super_jump_strength
+            using_super_jump = False
+
+        # Pick the frame for this tick; collisions below use its mask
+        player_animation.update(orient_Player, -1 if flying else player_dy)
+
+        # Handle collisions and platform interactions
+        platforms_to_remove.clear()
+        for platform in platforms:
+            kind = platform_types.types[platform.type_id]  # Everything below reads from this one lookup
+            if kind.update is not None:
+                kind.update(platform, width)
+
+            if kind.deadly:
+                # Touching a danger platform anywhere ends the run, so it keeps the full mask test
+                if check_collision(player_rect, player_animation.mask, platform.rect, platform.mask):
+                    game_over = True
+            elif player_dy > 0:
+                # Swept from last frame's position, so a fast fall cannot pass through the top edge
+                landed_y = physics.landing_y(previous_y, player_rect, player_animation.mask, platform.rect, platform.mask)
+                if landed_y is not None:
+                    player_rect.y = landed_y
+                    if not using_super_jump:
+                        player_dy = -jump_strength * kind.jump_scale
+
+                    score += kind.score
+                    if kind.breaks:
+                        platforms_to_remove.append(platform)
+                    if kind.flies:
+                        flying = True  # Activate fly effect
+                        fly_end_time = pygame.time.get_ticks() + fly_duration
+
+        # Remove breakable platforms
+        for platform in platforms_to_remove:
+            platforms.remove(platform)
+            strip_cache.invalidate(platform)
+            platform_pool.release(platform)
+        if player_rect.y < height // 4:
+            scroll_amount = height // 4 - player_rect.y
+            player_rect.y = height // 4
+            for platform in platforms:
+                platform.rect.y += scroll_amount
+            strip_cache.scroll(scroll_amount)
+            cull_platforms(platforms)
+
+        if player_rect.y < platforms[-1].rect.y + gap:
+            if random.random() < 0.5:
+                new_platform_y = platforms[-1].rect.y - random.randint(70, 120)
+                if new_platform_y >= 0:
+                    platform_type = platform_types.random_spawn_type()
+                    # Pulled sideways if the jump from the current top platform could not get there
+                    new_platform_x = reachability.reachable_spawn_x(
+                        random.randint(0, width - platform_width), platforms[-1],
+                        platforms[-1].rect.y - new_platform_y, platform_width, width
+                    )
+                    new_platform = platform_pool.acquire(
+                        new_platform_x, new_platform_y, platform_width, platform_height, platform_type
+                    )
+                    platforms.append(new_platform)
+                    strip_cache.invalidate(new_platform)
+
+        if player_rect.bottom >= height:
+            game_over = True
+            platform_pool.release_all(platforms)
+            strip_cache.clear()
+
+        if game_over:
+            save_highscore(score)
+            highscore = max(highscore, score)
+
+        # Drawing
+        strip_cache.draw(render_queue, platforms)  # Backdrop and static platforms in a handful of blits
+        draw_player(render_queue, player_rect)
+        draw_platforms(render_queue, platforms)
+
+
+        flying_text_surface = hud_text('flying', "Flying: True" if flying else "flying: False")
+        render_queue.add(flying_text_surface, (10, 10), renderqueue.HUD)
+
+        score_surface = hud_text('score', score, "Score: {}")
+        render_queue.add(score_surface, (width - 10 - score_surface.get_width(), 10), renderqueue.HUD)  # Right-aligned
+
+        highscore = max(highscore, load_highscore())  # Picks up the stored best once the writer has loaded it
+        highscore_surface = hud_text('highscore', highscore, "Highscore: {}")
+        render_queue.add(highscore_surface, (width - 10 - highscore_surface.get_width(), 30), renderqueue.HUD)
+
+        if game_over:
+            game_over_surface = hud_text('game over', "Game Over, Press Space to Continue")
+            game_over_position = ((width - game_over_surface.get_width()) // 2, (height - game_over_surface.get_height()) // 2)
+            render_queue.add(game_over_surface, game_over_position, renderqueue.HUD)
+
+        render_queue.submit()
+        viewport.present()
+        clock.tick(60)
 
-    if not flying:
-        player_dy += gravity
-        player_rect.y += player_dy
+    if show_stats:
+        print(platform_pool.summary())
+        print(strip_cache.summary())
+        print(render_queue.summary())
+    get_persistence().stop()
+    pygame.quit()
 
-    if using_super_jump:
-        # Ensure the super jump only affects the next jump
-        player_dy = -super_jump_strength
-        using_super_jump = False
 
-    # Handle collisions and platform interactions
-    platforms_to_remove = []
-    for platform in platforms:
-        if platform.platform_type == 'moving':
-            platform.rect.x += platform.direction * platform.speed
-            if platform.rect.left <= 0:
-                platform.rect.left = 0
-                platform.direction = 1  # Move right
-            elif platform.rect.right >= width:
-                platform.rect.right = width
-                platform.direction = -1  # Move left
-
-        if check_collision(player_rect, player_mask, platform.rect, platform.mask):
-            if player_dy > 0 and platform.platform_type != 'danger':
-                player_rect.bottom = platform.rect.top
-                if not using_super_jump:
-                    if platform.platform_type == 'superJump':
-                        player_dy = -super_jump_strength
-                    else:
-                        player_dy = -jump_strength
-
-                if platform.platform_type == 'breakable':
-                    platforms_to_remove.append(platform)
-                    score += 1  # Increment score when hitting breakable platform
-                elif platform.platform_type == 'fly':
-                    score += 10
-                    flying = True  # Activate fly effect
-                    fly_end_time = pygame.time.get_ticks() + fly_duration
-                elif platform.platform_type == 'normal':
-                    score += 1
-                elif platform.platform_type == 'moving':
-                    score += 2
-                elif platform.platform_type == 'superJump':
-                    score += 5
-            if platform.platform_type == 'danger':
-                 game_over = True
-
-    # Remove breakable platforms
-    platforms = [p for p in platforms if p not in platforms_to_remove]
-    if player_rect.y < height // 4:
-        scroll_amount = height // 4 - player_rect.y
-        player_rect.y = height // 4
-        for platform in platforms:
-            platform.rect.y += scroll_amount
-        platforms = [p for p in platforms if p.rect.y >= 0]
-
-    if player_rect.y < platforms[-1].rect.y + gap:
-        if random.random() < 0.5:
-            new_platform_y = platforms[-1].rect.y - random.randint(70, 120)
-            if new_platform_y >= 0:
-                platform_type = random.choices(
-                    ['normal', 'breakable', 'fly', 'moving', 'danger'],
-                    [0.60, 0.10, 0.07, 0.20, 0.05]
-                )[0]
-                new_platform = Platform(
-                    pygame.Rect(
-                        random.randint(0, width - platform_width),
-                        new_platform_y,
-                        platform_width,
-                        platform_height
-                    ),
-                    platform_type
-                )
-                platforms.append(new_platform)
-
-    if player_rect.bottom >= height:
-        game_over = True
-        platforms.clear()
-
-    # Drawing
-    window.fill((0, 255, 255))
-    window.blit(background_image,(0,100))
-    draw_player(window, player_rect)
-    draw_platforms(window, platforms)
-
-
-    flying_state_text = "Flying: True" if flying else "flying: False"
-    flying_text_surface = font.render(flying_state_text, True, (0, 0, 0))
-    window.blit(flying_text_surface, (10, 10))
-
-    score_text = f"Score: {score}"
-    score_surface = font.render(score_text, True, (0, 0, 0))
-    score_rect = score_surface.get_rect(topright=(width - 10, 10))
-    window.blit(score_surface, score_rect)
-
-    highscore_text = f"Highscore: {highscore}"
-    highscore_surface = font.render(highscore_text, True, (0, 0, 0))
-    highscore_rect = highscore_surface.get_rect(topright=(width - 10, 30))
-    window.blit(highscore_surface, highscore_rect)
-
-    if game_over:
-        game_over_text = "Game Over, Press Space to Continue"
-        game_over_surface = font.render(game_over_text, True, (0, 0, 0))
-        game_over_rect = game_over_surface.get_rect(center=(width // 2, height // 2))
-        window.blit(game_over_surface, game_over_rect)
-
-    pygame.display.flip()
-    clock.tick(60)
-
-pygame.quit()
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,31 @@
+# Area-of-interest filtering for position updates, keyed on vertical world height.
+# Heights are the y in MOVE and in simulation snapshots: screen y minus everything scrolled
+# so far, in playfield pixels (one screen is 450). Each band is (max height difference,
+# send every Nth update). Players further away than the last band get no position updates.
+interest_bands = [
+    (450, 1),    # Same screen: every update
+    (1350, 4),   # Within three screens: every 4th update
+    (4500, 15),  # Within ten screens: about four updates a second at 60 fps
+]
+
+
+class InterestFilter:
+    def __init__(self, bands=interest_bands):
+        self.bands = sorted(bands)
+        self.update_counts = {}  # sender id -> position updates seen so far
+
+    def next_update(self, sender_id):
+        count = self.update_counts.get(sender_id, 0) + 1
+        self.update_counts[sender_id] = count
+        return count
+
+    def should_send(self, count, receiver_id, sender_y, receiver_y):
+        distance = abs(sender_y - receiver_y)
+        for max_distance, every in self.bands:
+            if distance <= max_distance:
+                # Offset by receiver so low-rate receivers are spread over different ticks
+                return (count + receiver_id) % every == 0
+        return False
+
+    def forget(self, sender_id):
+        self.update_counts.pop(sender_id, None)
@@ -0,0 +1,152 @@
+import os
+import sqlite3
+import threading
+import time
+
+leaderboard_file = 'leaderboard.db'
+legacy_highscore_file = 'highscore.txt'
+cache_size = 10  # Number of top entries kept in memory for the HUD
+
+
+class Leaderboard:
+    def __init__(self, path=leaderboard_file, cache_size=cache_size):
+        self.path = path
+        self.cache_size = cache_size
+        self.lock = threading.Lock()
+        self.top_cache = []  # [(player, score, created_at), ...] best first
+
+        # One connection shared by the game thread and the server handlers
+        self.connection = sqlite3.connect(path, timeout=5.0, check_same_thread=False, isolation_level=None)
+        self.connection.execute('PRAGMA journal_mode=WAL')  # Readers never block the writer
+        self.connection.execute('PRAGMA synchronous=NORMAL')
+        self.connection.execute(
+            'CREATE TABLE IF NOT EXISTS scores ('
+            ' id INTEGER PRIMARY KEY,'
+            ' player TEXT NOT NULL,'
+            ' score INTEGER NOT NULL,'
+            ' created_at REAL NOT NULL)'
+        )
+        self.connection.execute('CREATE INDEX IF NOT EXISTS scores_by_score ON scores (score DESC)')
+        self.connection.execute('CREATE INDEX IF NOT EXISTS scores_by_player ON scores (player, score DESC)')
+        self.connection.execute(
+            'CREATE TABLE IF NOT EXISTS stats ('
+            ' name TEXT PRIMARY KEY,'
+            ' value INTEGER NOT NULL,'
+            ' updated_at REAL NOT NULL)'
+        )
+
+        self.import_legacy_highscore()
+        self.refresh_cache()
+
+    def import_legacy_highscore(self, path=legacy_highscore_file):
+        # Carry the old single-integer highscore over once, skipping torn or empty files
+        if not os.path.isfile(path):
+            return
+        with self.lock:
+            if self.connection.execute('SELECT 1 FROM scores LIMIT 1').fetchone():
+                return
+        try:
+            with open(path, 'r') as file:
+                legacy_score = int(file.read().strip())
+        except ValueError:
+            return
+        self.record('legacy', legacy_score)
+
+    def record(self, player, score):
+        self.record_many([(player, score)])
+
+    def record_many(self, entries):
+        # All entries land in one transaction, so a crash never leaves half a batch
+        now = time.time()
+        rows = [(player, int(score), now) for player, score in entries]
+        if not rows:
+            return
+        with self.lock:
+            self.connection.execute('BEGIN IMMEDIATE')
+            try:
+                self.connection.executemany('INSERT INTO scores (player, score, created_at) VALUES (?, ?, ?)', rows)
+                self.connection.execute('COMMIT')
+            except sqlite3.Error:
+                self.rollback()
+                raise
+            self.update_cache(rows)
+
+    def add_stats(self, stats):
+        now = time.time()
+        rows = [(name, int(amount), now) for name, amount in stats.items()]
+        with self.lock:
+            self.connection.execute('BEGIN IMMEDIATE')
+            try:
+                self.connection.executemany(
+                    'INSERT INTO stats (name, value, updated_at) VALUES (?, ?, ?) '
+                    'ON CONFLICT (name) DO UPDATE SET value = value + excluded.value, updated_at = excluded.updated_at',
+                    rows
+                )
+                self.connection.execute('COMMIT')
+            except sqlite3.Error:
+                self.rollback()
+                raise
+
+    def rollback(self):
+        # A failed COMMIT (SQLITE_BUSY) leaves the transaction open; the next BEGIN would fail forever
+        if self.connection.in_transaction:
+            self.connection.execute('ROLLBACK')
+
+    def stat(self, name):
+        with self.lock:
+            row = self.connection.execute('SELECT value FROM stats WHERE name = ?', (name,)).fetchone()
+        return row[0] if row else 0
+
+    def top(self, count=cache_size):
+        if count <= self.cache_size:
+            return self.top_cache[:count]
+        with self.lock:
+            return self.connection.execute(
+                'SELECT player, score, created_at FROM scores ORDER BY score DESC LIMIT ?', (count,)
+            ).fetchall()
+
+    def player_best(self, player):
+        with self.lock:
+            row = self.connection.execute(
+                'SELECT MAX(score) FROM scores WHERE player = ?', (player,)
+            ).fetchone()
+        return row[0] if row[0] is not None else 0
+
+    def best(self):
+        # Served from the cache, so the HUD never touches the database
+        return self.top_cache[0][1] if self.top_cache else 0
+
+    def refresh_cache(self):
+        with self.lock:
+            self.top_cache = self.connection.execute(
+                'SELECT player, score, created_at FROM scores ORDER BY score DESC LIMIT ?', (self.cache_size,)
+            ).fetchall()
+
+    def update_cache(self, rows):
+        # Merge new rows instead of re-querying; only rows that beat the cache floor matter
+        if len(self.top_cache) == self.cache_size:
+            floor = self.top_cache[-1][1]
+            rows = [row for row in rows if row[1] > floor]
+            if not rows:
+                return
+        merged = sorted(self.top_cache + rows, key=lambda row: row[1], reverse=True)
+        self.top_cache = merged[:self.cache_size]
+
+    def sync(self):
+        # Copy the WAL into the database file; the checkpoint fsyncs it
+        with self.lock:
+            self.connection.execute('PRAGMA wal_checkpoint(TRUNCATE)')
+
+    def close(self):
+        with self.lock:
+            self.connection.close()
+
+
+_leaderboard = None
+
+
+def get_leaderboard():
+    global _leaderboard
+    if _leaderboard is None:
+        _leaderboard = Leaderboard()
+    return _leaderboard
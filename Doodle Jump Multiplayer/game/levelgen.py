@@ -0,0 +1,133 @@
+import math
+import random
+
+import platform_types
+import reachability
+
+numpy = None  # Imported on first use, so importing the game does not pay for it
+numpy_checked = False
+
+# Level layout: rows of platforms, vertical_spacing apart. Each row picks a moving platform with
+# moving_chance (and then holds only that one), otherwise each column gets a platform with
+# place_chance. Random numbers for a whole chunk (or many levels) are drawn in one batch.
+moving_chance = 0.2
+place_chance = 0.5
+column_spacing_cells = 15
+row_spacing_cells = 8
+
+_tables = {}  # (values, weights) -> AliasTable
+
+
+def get_numpy():
+    # None when NumPy is not installed; the same layouts are then sampled one value at a time
+    global numpy, numpy_checked
+    if not numpy_checked:
+        numpy_checked = True
+        try:
+            import numpy
+        except ImportError:
+            numpy = None
+    return numpy
+
+
+class AliasTable:
+    # Walker/Vose alias method: one uniform index and one coin flip per sample, whatever the weights
+    def __init__(self, values, weights):
+        count = len(values)
+        total = float(sum(weights))
+        scaled = [weight * count / total for weight in weights]
+        self.values = list(values)
+        self.prob = [1.0] * count
+        self.alias = list(range(count))
+        small = [index for index, weight in enumerate(scaled) if weight < 1.0]
+        large = [index for index, weight in enumerate(scaled) if weight >= 1.0]
+        while small and large:
+            less = small.pop()
+            more = large.pop()
+            self.prob[less] = scaled[less]
+            self.alias[less] = more
+            scaled[more] -= 1.0 - scaled[less]
+            (small if scaled[more] < 1.0 else large).append(more)
+        self.arrays = None  # NumPy copies of values, prob and alias, made on first batch
+
+    def sample(self, rng=random):
+        index = int(rng.random() * len(self.values))
+        return self.values[index if rng.random() < self.prob[index] else self.alias[index]]
+
+    def sample_array(self, shape, generator):
+        # NumPy only: an array of samples with the given shape
+        if self.arrays is None:
+            self.arrays = (numpy.array(self.values), numpy.array(self.prob), numpy.array(self.alias))
+        values, prob, alias = self.arrays
+        index = generator.integers(0, len(self.values), size=shape)
+        keep = generator.random(shape) < prob[index]
+        return values[numpy.where(keep, index, alias[index])]
+
+
+def alias_table(values, weights):
+    # One table per level configuration, reused by every level generated with it
+    key = (tuple(values), tuple(weights))
+    table = _tables.get(key)
+    if table is None:
+        table = _tables[key] = AliasTable(values, weights)
+    return table
+
+
+def row_type_table():
+    return alias_table(
+        platform_types.row_type_ids,
+        [platform_types.types[type_id].row_weight for type_id in platform_types.row_type_ids]
+    )
+
+
+def generate_layouts(levels, grid_width, grid_height, cell_size, num_platforms, y_offset=0, seed=None, platform_width=50):
+    # levels lists of (x, y, type id), bottom first, with stepping stones added wherever a gap was out of reach
+    columns = list(range(0, grid_width, cell_size * column_spacing_cells))
+    vertical_spacing = cell_size * row_spacing_cells
+    rows = math.ceil(grid_height / vertical_spacing)
+    if get_numpy() is not None:
+        layouts = _numpy_layouts(levels, rows, columns, vertical_spacing, num_platforms, y_offset, seed)
+        return [reachability.patch_layout(layout, platform_width, grid_width) for layout in layouts]
+
+    rng = random.Random(seed) if seed is not None else random
+    table = row_type_table()
+    layouts = []
+    for _ in range(levels):
+        layout = []
+        for row in range(rows):
+            y = y_offset + row * vertical_spacing
+            row_columns = columns.copy()
+            rng.shuffle(row_columns)
+            if rng.random() < moving_chance:
+                layout.append((row_columns[-1], y, platform_types.MOVING))
+            else:
+                for x in row_columns:
+                    if rng.random() < place_chance:
+                        layout.append((x, y, table.sample(rng)))
+        layouts.append(reachability.patch_layout(layout[:num_platforms], platform_width, grid_width))
+    return layouts
+
+
+def _numpy_layouts(levels, rows, columns, vertical_spacing, num_platforms, y_offset, seed):
+    generator = numpy.random.default_rng(seed)
+    shape = (levels, rows, len(columns))
+    # Per-row column shuffles, placement rolls and types for every level at once
+    xs = numpy.array(columns)[numpy.argsort(generator.random(shape), axis=2)]
+    placed = generator.random(shape) < place_chance
+    type_ids = row_type_table().sample_array(shape, generator)
+    moving = generator.random((levels, rows)) < moving_chance
+    placed[moving] = False
+    placed[moving, -1] = True
+    type_ids[moving, -1] = platform_types.MOVING
+    ys = numpy.broadcast_to((y_offset + numpy.arange(rows) * vertical_spacing)[None, :, None], shape)
+
+    layouts = []
+    for level in range(levels):
+        keep = placed[level]
+        layout = list(zip(xs[level][keep].tolist(), ys[level][keep].tolist(), type_ids[level][keep].tolist()))
+        layouts.append(layout[:num_platforms])
+    return layouts
+
+
+def generate_layout(grid_width, grid_height, cell_size, num_platforms, y_offset=0, seed=None, platform_width=50):
+    return generate_layouts(1, grid_width, grid_height, cell_size, num_platforms, y_offset, seed, platform_width)[0]
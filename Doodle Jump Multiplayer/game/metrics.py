@@ -0,0 +1,176 @@
+import bisect
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+metrics_host = '127.0.0.1'  # Only reachable from the machine itself
+metrics_port = 9108
+log_interval = 10.0  # Seconds between summary log lines
+tick_stall_seconds = 1.0  # /health reports stalled if no tick was seen for this long
+
+latency_buckets = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25)
+
+registry = []
+
+
+class Counter:
+    kind = 'counter'
+
+    def __init__(self, name, help_text):
+        self.name = name
+        self.help_text = help_text
+        self.value = 0
+        self.lock = threading.Lock()
+        registry.append(self)
+
+    def inc(self, amount=1):
+        with self.lock:
+            self.value += amount
+
+    def render(self):
+        return [f"{self.name} {self.value}"]
+
+
+class Gauge(Counter):
+    kind = 'gauge'
+
+    def dec(self, amount=1):
+        self.inc(-amount)
+
+    def set(self, value):
+        with self.lock:
+            self.value = value
+
+
+class Histogram:
+    kind = 'histogram'
+
+    def __init__(self, name, help_text, buckets=latency_buckets):
+        self.name = name
+        self.help_text = help_text
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)  # Last slot is +Inf
+        self.total = 0.0
+        self.count = 0
+        self.last_observed = None
+        self.lock = threading.Lock()
+        registry.append(self)
+
+    def observe(self, value):
+        index = bisect.bisect_left(self.buckets, value)
+        with self.lock:
+            self.counts[index] += 1
+            self.total += value
+            self.count += 1
+            self.last_observed = time.monotonic()
+
+    def quantile(self, q):
+        # Upper bound of the bucket holding the q-th observation
+        with self.lock:
+            counts = list(self.counts)
+            count = self.count
+        if not count:
+            return 0.0
+        rank = q * count
+        seen = 0
+        for index, bucket_count in enumerate(counts):
+            seen += bucket_count
+            if seen >= rank:
+                return self.buckets[index] if index < len(self.buckets) else float('inf')
+        return float('inf')
+
+    def render(self):
+        with self.lock:
+            counts = list(self.counts)
+            total = self.total
+            count = self.count
+        lines = []
+        cumulative = 0
+        for bound, bucket_count in zip(self.buckets, counts):
+            cumulative += bucket_count
+            lines.append(f'{self.name}_bucket{{le="{bound}"}} {cumulative}')
+        lines.append(f'{self.name}_bucket{{le="+Inf"}} {count}')
+        lines.append(f"{self.name}_sum {total}")
+        lines.append(f"{self.name}_count {count}")
+        return lines
+
+
+# Server metrics
+connections_total = Counter('doodle_connections_total', 'Client connections accepted')
+connections = Gauge('doodle_connections', 'Clients currently connected')
+rooms = Gauge('doodle_rooms', 'Rooms currently open')
+simulated_rooms = Gauge('doodle_simulated_rooms', 'Rooms whose physics runs in a simulation worker')
+messages_in = Counter('doodle_messages_in_total', 'Messages received from clients')
+messages_out = Counter('doodle_messages_out_total', 'Messages written to clients and spectators')
+bytes_in = Counter('doodle_bytes_in_total', 'Bytes received from clients')
+bytes_out = Counter('doodle_bytes_out_total', 'Bytes written to clients and spectators')
+send_queue_depth = Gauge('doodle_send_queue_depth', 'Messages queued in client writers, not yet written')
+broadcast_seconds = Histogram('doodle_broadcast_seconds', 'Time to fan one message out to a room')
+tick_seconds = Histogram('doodle_tick_seconds', 'Duration of one simulation tick')
+
+
+def render():
+    lines = []
+    for metric in registry:
+        lines.append(f"# HELP {metric.name} {metric.help_text}")
+        lines.append(f"# TYPE {metric.name} {metric.kind}")
+        lines.extend(metric.render())
+    return "\n".join(lines) + "\n"
+
+
+def tick_health():
+    # Ticks only exist while a simulated room is open; an idle server has nothing to stall
+    if simulated_rooms.value <= 0 or tick_seconds.last_observed is None:
+        return True
+    return time.monotonic() - tick_seconds.last_observed < tick_stall_seconds
+
+
+class MetricsHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path == '/metrics':
+            status, body, content_type = 200, render(), 'text/plain; version=0.0.4'
+        elif self.path == '/health':
+            healthy = tick_health()
+            status = 200 if healthy else 503
+            body = "ok\n" if healthy else "tick stalled\n"
+            content_type = 'text/plain'
+        else:
+            status, body, content_type = 404, "not found\n", 'text/plain'
+        data = body.encode()
+        self.send_response(status)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, format, *args):
+        pass  # Scrapes every few seconds would drown the connection log
+
+
+def start_http_server(host=metrics_host, port=metrics_port):
+    http_server = ThreadingHTTPServer((host, port), MetricsHandler)
+    threading.Thread(target=http_server.serve_forever, daemon=True).start()
+    print(f"Metrics on http://{host}:{port}/metrics")
+    return http_server
+
+
+def log_loop(interval=log_interval, label=''):
+    previous = (messages_in.value, messages_out.value, bytes_in.value, bytes_out.value)
+    while True:
+        time.sleep(interval)
+        current = (messages_in.value, messages_out.value, bytes_in.value, bytes_out.value)
+        rates = [(now - before) / interval for now, before in zip(current, previous)]
+        previous = current
+        print(
+            f"{label}conns={connections.value} rooms={rooms.value} "
+            f"msg/s in={rates[0]:.0f} out={rates[1]:.0f} "
+            f"bytes/s in={rates[2]:.0f} out={rates[3]:.0f} "
+            f"queued={send_queue_depth.value} "
+            f"broadcast p99={broadcast_seconds.quantile(0.99) * 1000:.2f}ms "
+            f"tick p99={tick_seconds.quantile(0.99) * 1000:.2f}ms"
+        )
+
+
+def start_log_thread(interval=log_interval, label=''):
+    # label prefixes every line, so several worker processes can share one log
+    threading.Thread(target=log_loop, args=(interval, label), daemon=True).start()
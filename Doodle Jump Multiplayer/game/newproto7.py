@@ -2,35 +2,8 @@ import pygame
 import random
 import os
 
-# Initialize Pygame
-pygame.init()
-pygame.font.init()
-
-screen = pygame.display.set_mode((800, 600))
-
-# Load images and masks
-def load_image_with_mask(image_path):
-    try:
-        image = pygame.image.load(image_path).convert_alpha()
-        mask = pygame.mask.from_surface(image)
-        return image, mask
-    except pygame.error as e:
-        print(f"Cannot load image: {image_path} - {e}")
-        return None, None
-
-# Load player and platform images
-player_image, player_mask = load_image_with_mask('Doodler5.png')
-platform_images = {
-    'normal': load_image_with_mask('PlatNorm.png'),
-    'breakable': load_image_with_mask('BreakPlat.png'),
-    'fly': load_image_with_mask('FlyPlat.png'),
-    'moving': load_image_with_mask('MovePlat.png'),
-    'danger': load_image_with_mask('DangerPlat.png'),
-    'superJump': load_image_with_mask('SuperJumpPlat.png')
-}
-
-# Load background image
-background_image = pygame.image.load('background.png').convert()
+import assets
+from persistence import get_persistence
 
 # Constants
 width, height = 300, 450
@@ -42,9 +15,9 @@ gravity = 0.2
 jump_strength = 9
 super_jump_strength = jump_strength * 2
 fly_duration = 5000  # Duration of fly effect in milliseconds
+player_name = os.environ.get('DOODLE_PLAYER', 'player')  # Leaderboard entry name
 
-# Initialize font
-font = pygame.font.SysFont(None, 24)
+font = None  # Created in main(); SysFont needs pygame initialised
 
 # Functions
 def create_window(width, height):
@@ -53,8 +26,12 @@ def create_window(width, height):
     pygame.display.set_caption("Doodle Jump")
     return win
 
+def wait_events():
+    # Sleeps until at least one event arrives, then returns it with anything else already queued
+    return [pygame.event.wait()] + pygame.event.get()
+
 def draw_player(win, player_rect):
-    win.blit(player_image, player_rect)  # Draw player image
+    win.blit(assets.player_image()[0], player_rect)  # Draw player image
 
 def draw_platforms(win, platforms):
     for platform in platforms:
@@ -115,7 +92,7 @@ class Platform:
     def __init__(self, rect, platform_type):
         self.rect = rect
         self.platform_type = platform_type
-        self.image, self.mask = platform_images[platform_type]
+        self.image, self.mask = assets.platform_image(platform_type)
         self.scored = False  # Track if the platform has been scored
         if platform_type == 'moving':
             self.direction = random.choice([-1, 1])  # Start moving left or right randomly
@@ -142,15 +119,13 @@ def reset_game():
 
 # Load highscore
 def load_highscore():
-    if os.path.isfile('highscore.txt'):
-        with open('highscore.txt', 'r') as file:
-            return int(file.read().strip())
-    return 0
+    return get_persistence().best()
 
 # Save highscore
 def save_highscore(new_highscore):
-    with open('highscore.txt', 'w') as file:
-        file.write(str(new_highscore))
+    # Queued for the background writer; the frame loop never waits on disk
+    get_persistence().submit_score(player_name, new_highscore)
+    get_persistence().submit_stat('runs')
 
 def place_player_on_platform(platforms, player_rect):
     for platform in platforms:
@@ -171,130 +146,153 @@ game_over = False
 super_jump_count = 0
 super_jump_strength = jump_strength * 2
 using_super_jump = False
-highscore = load_highscore()
-window = create_window(width, height)
-platforms = generate_platforms(width, height, cell_size, initial_platform_count)
-
-# Game loop
-clock = pygame.time.Clock()
-running = True
-while running:
-    for event in pygame.event.get():
-        if event.type == pygame.QUIT:
-            running = False
-        elif event.type == pygame.KEYDOWN:
-            if event.key == pygame.K_SPACE:
-                if game_over:
-                    reset_game()
-                elif super_jump_count > 0:
-                    using_super_jump = True
-                    super_jump_count -= 1
-            if event.key == pygame.K_ESCAPE:
+highscore = 0
+window = None
+platforms = []
+
+def main():
+    global player_dy, flying, fly_end_time, score, game_over, super_jump_count, using_super_jump
+    global platforms, highscore, window, font
+
+    # Window, font, images and the score store are only set up when the game actually runs
+    pygame.init()
+    pygame.font.init()
+    font = pygame.font.SysFont(None, 24)
+    window = create_window(width, height)
+    highscore = load_highscore()
+    platforms = generate_platforms(width, height, cell_size, initial_platform_count)
+    background_image = assets.background_image()
+
+    # Game loop
+    clock = pygame.time.Clock()
+    running = True
+    game_over_shown = False  # The game-over screen is up and nothing will change until there is input
+    while running:
+        # The game-over screen blocks here instead of redrawing an unchanged frame 60 times a second
+        for event in wait_events() if game_over_shown else pygame.event.get():
+            if event.type == pygame.QUIT:
                 running = False
+            elif event.type == pygame.KEYDOWN:
+                if event.key == pygame.K_SPACE:
+                    if game_over:
+                        reset_game()
+                        game_over_shown = False
+                    elif super_jump_count > 0:
+                        using_super_jump = True
+                        super_jump_count -= 1
+                if event.key == pygame.K_ESCAPE:
+                    running = False
+
+        if game_over:
+            if not game_over_shown:
+                window.fill((0, 255, 255))
+                game_over_text = "Game Over, Press Space to Continue"
+                game_over_surface = font.render(game_over_text, True, (0, 0, 0))
+                game_over_rect = game_over_surface.get_rect(center=(width // 2, height // 2))
+                window.blit(game_over_surface, game_over_rect)
+                pygame.display.flip()
+                game_over_shown = True
+            continue
+
+        keys = pygame.key.get_pressed()
+        if not game_over:
+            if keys[pygame.K_LEFT]:
+                player_rect.x -= 3
+                if player_rect.left < -player_rect.width:
+                    player_rect.right = width
+            if keys[pygame.K_RIGHT]:
+                player_rect.x += 3
+                if player_rect.right > width:
+                    player_rect.left = -player_rect.width
+
+        current_time = pygame.time.get_ticks()
+        if flying:
+            if current_time < fly_end_time:
+                player_rect.y -= 5  # Move player upwards while flying
+            else:
+                flying = False
+                player_dy = gravity  # Resume normal gravity
+
+        if not flying:
+            player_dy += gravity
+            player_rect.y += player_dy
+
+        if using_super_jump:
+            # Ensure the super jump only affects the next jump
+            player_dy = -super_jump_strength
+            using_super_jump = False
+
+        # Handle collisions and platform interactions
+        platforms_to_remove = []
+        for platform in platforms:
+            if platform.platform_type == 'moving':
+                platform.rect.x += platform.direction * platform.speed
+                if platform.rect.left <= 0:
+                    platform.rect.left = 0
+                    platform.direction = 1  # Move right
+                elif platform.rect.right >= width:
+                    platform.rect.right = width
+                    platform.direction = -1  # Move left
+
+            if player_rect.bottom >= platform.rect.top and player_rect.bottom <= platform.rect.bottom and player_dy > 0:
+                if player_rect.left <= platform.rect.right and player_rect.right >= platform.rect.left:
+                    if platform.platform_type == 'breakable':
+                        platforms_to_remove.append(platform)
+                    elif platform.platform_type == 'fly':
+                        flying = True
+                        fly_end_time = current_time + fly_duration
+                    elif platform.platform_type == 'superJump':
+                        super_jump_count += 1
+                    player_dy = -jump_strength
+                    score += 1
+
+        for platform in platforms_to_remove:
+            platforms.remove(platform)
+
+        # Scroll platforms down
+        if player_rect.top <= height // 4:
+            for platform in platforms:
+                platform.rect.y += abs(player_dy)
+
+            player_rect.y += abs(player_dy)
+
+            # Add new platforms if needed
+            if len(platforms) < initial_platform_count:
+                new_platform_y = min(platform.rect.y for platform in platforms) - gap
+                platform_type = random.choices(
+                    ['normal', 'breakable', 'fly', 'superJump', 'danger', 'moving'],
+                    [0.60, 0.10, 0.07, 0.5, 0.05, 0.20]
+                )[0]
+                new_platform = Platform(
+                    pygame.Rect(random.randint(0, width - platform_width), new_platform_y, platform_width, platform_height),
+                    platform_type
+                )
+                platforms.append(new_platform)
+            platforms = [platform for platform in platforms if platform.rect.top < height]
+        if player_rect.top > height:
+            game_over = True
+            if score > highscore:
+                highscore = score
+                save_highscore(highscore)
+
+        # Draw everything
+        window.blit(background_image, (0, 0))  # Draw background image
+        draw_platforms(window, platforms)
+        draw_player(window, player_rect)
+
+        # Draw score and highscore
+        highscore = max(highscore, load_highscore())
+        score_surface = font.render(f"Score: {score}", True, (0, 0, 0))
+        window.blit(score_surface, (10, 10))
+        highscore_surface = font.render(f"Highscore: {highscore}", True, (0, 0, 0))
+        window.blit(highscore_surface, (10, 40))
 
-    if game_over:
-        window.fill((0, 255, 255))
-        game_over_text = "Game Over, Press Space to Continue"
-        game_over_surface = font.render(game_over_text, True, (0, 0, 0))
-        game_over_rect = game_over_surface.get_rect(center=(width // 2, height // 2))
-        window.blit(game_over_surface, game_over_rect)
         pygame.display.flip()
         clock.tick(60)
-        continue
-
-    keys = pygame.key.get_pressed()
-    if not game_over:
-        if keys[pygame.K_LEFT]:
-            player_rect.x -= 3
-            if player_rect.left < -player_rect.width:
-                player_rect.right = width
-        if keys[pygame.K_RIGHT]:
-            player_rect.x += 3
-            if player_rect.right > width:
-                player_rect.left = -player_rect.width
-
-    current_time = pygame.time.get_ticks()
-    if flying:
-        if current_time < fly_end_time:
-            player_rect.y -= 5  # Move player upwards while flying
-        else:
-            flying = False
-            player_dy = gravity  # Resume normal gravity
-
-    if not flying:
-        player_dy += gravity
-        player_rect.y += player_dy
-
-    if using_super_jump:
-        # Ensure the super jump only affects the next jump
-        player_dy = -super_jump_strength
-        using_super_jump = False
-
-    # Handle collisions and platform interactions
-    platforms_to_remove = []
-    for platform in platforms:
-        if platform.platform_type == 'moving':
-            platform.rect.x += platform.direction * platform.speed
-            if platform.rect.left <= 0:
-                platform.rect.left = 0
-                platform.direction = 1  # Move right
-            elif platform.rect.right >= width:
-                platform.rect.right = width
-                platform.direction = -1  # Move left
-
-        if player_rect.bottom >= platform.rect.top and player_rect.bottom <= platform.rect.bottom and player_dy > 0:
-            if player_rect.left <= platform.rect.right and player_rect.right >= platform.rect.left:
-                if platform.platform_type == 'breakable':
-                    platforms_to_remove.append(platform)
-                elif platform.platform_type == 'fly':
-                    flying = True
-                    fly_end_time = current_time + fly_duration
-                elif platform.platform_type == 'superJump':
-                    super_jump_count += 1
-                player_dy = -jump_strength
-                score += 1
-
-    for platform in platforms_to_remove:
-        platforms.remove(platform)
-
-    # Scroll platforms down
-    if player_rect.top <= height // 4:
-        for platform in platforms:
-            platform.rect.y += abs(player_dy)
-
-        player_rect.y += abs(player_dy)
-
-        # Add new platforms if needed
-        if len(platforms) < initial_platform_count:
-            new_platform_y = min(platform.rect.y for platform in platforms) - gap
-            platform_type = random.choices(
-                ['normal', 'breakable', 'fly', 'superJump', 'danger', 'moving'],
-                [0.60, 0.10, 0.07, 0.5, 0.05, 0.20]
-            )[0]
-            new_platform = Platform(
-                pygame.Rect(random.randint(0, width - platform_width), new_platform_y, platform_width, platform_height),
-                platform_type
-            )
-            platforms.append(new_platform)
-        platforms = [platform for platform in platforms if platform.rect.top < height]
-    if player_rect.top > height:
-        game_over = True
-        if score > highscore:
-            highscore = score
-            save_highscore(highscore)
-
-    # Draw everything
-    window.blit(background_image, (0, 0))  # Draw background image
-    draw_platforms(window, platforms)
-    draw_player(window, player_rect)
-
-    # Draw score and highscore
-    score_surface = font.render(f"Score: {score}", True, (0, 0, 0))
-    window.blit(score_surface, (10, 10))
-    highscore_surface = font.render(f"Highscore: {highscore}", True, (0, 0, 0))
-    window.blit(highscore_surface, (10, 40))
-
-    pygame.display.flip()
-    clock.tick(60)
-
-pygame.quit()
+
+    get_persistence().stop()
+    pygame.quit()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,112 @@
+import queue
+import sqlite3
+import threading
+import time
+
+from leaderboard import get_leaderboard
+
+flush_interval = 2.0  # Seconds between background flushes
+max_pending_scores = 1000  # Scores kept for retrying while the database keeps failing; oldest go first
+
+
+class PersistenceWorker:
+    def __init__(self, leaderboard_factory=get_leaderboard, flush_interval=flush_interval):
+        self.leaderboard_factory = leaderboard_factory
+        self.flush_interval = flush_interval
+        self.records = queue.Queue()
+        self.leaderboard = None
+        self.error = None  # Why the leaderboard could not be opened; nothing is saved then
+        self.loaded = threading.Event()  # Set once the leaderboard has been opened off-thread
+        self.thread = threading.Thread(target=self.run, name='persistence', daemon=True)
+
+    def start(self):
+        self.thread.start()
+        return self
+
+    def submit_score(self, player, score):
+        if self.error is None:
+            self.records.put(('score', player, score))
+
+    def submit_stat(self, name, amount=1):
+        if self.error is None:
+            self.records.put(('stat', name, amount))
+
+    def best(self):
+        # 0 until the worker has opened the database, or if it never could; never blocks the caller
+        if not self.loaded.is_set() or self.leaderboard is None:
+            return 0
+        return self.leaderboard.best()
+
+    def stop(self, timeout=5.0):
+        self.records.put(None)
+        self.thread.join(timeout)
+
+    def run(self):
+        try:
+            self.leaderboard = self.leaderboard_factory()
+        except Exception as e:
+            self.error = e
+            print(f"Cannot open the leaderboard, scores will not be saved: {e}")
+            self.loaded.set()
+            # Keep taking records so nothing piles up until stop()
+            while self.records.get() is not None:
+                pass
+            return
+        self.loaded.set()
+
+        scores = []
+        stats = {}
+        next_flush = time.monotonic() + self.flush_interval
+        running = True
+        while running:
+            try:
+                record = self.records.get(timeout=max(0.0, next_flush - time.monotonic()))
+            except queue.Empty:
+                record = False
+
+            if record is None:
+                running = False
+            elif record:
+                kind, key, value = record
+                if kind == 'score':
+                    scores.append((key, value))
+                else:
+                    stats[key] = stats.get(key, 0) + value  # Coalesce counters into one row update
+
+            if not running or time.monotonic() >= next_flush:
+                self.flush(scores, stats)  # Whatever fails stays in scores and stats for the next flush
+                if len(scores) > max_pending_scores:
+                    print(f"Dropping {len(scores) - max_pending_scores} unsaved scores")
+                    del scores[:-max_pending_scores]
+                next_flush = time.monotonic() + self.flush_interval
+
+        if scores or stats:
+            print(f"Lost {len(scores)} scores and {len(stats)} stats that could not be saved")
+
+        # Checkpoint the WAL so everything is fsynced into the main database file before exit
+        try:
+            self.leaderboard.sync()
+        except sqlite3.Error as e:
+            print(f"Cannot sync scores: {e}")
+
+    def flush(self, scores, stats):
+        # Scores and stats are separate transactions; each is cleared only once it is saved
+        try:
+            if scores:
+                self.leaderboard.record_many(scores)
+                scores.clear()
+            if stats:
+                self.leaderboard.add_stats(stats)
+                stats.clear()
+        except sqlite3.Error as e:
+            print(f"Cannot save scores, retrying in {self.flush_interval:g}s: {e}")
+
+
+_worker = None
+
+
+def get_persistence():
+    global _worker
+    if _worker is None:
+        _worker = PersistenceWorker().start()
+    return _worker
@@ -0,0 +1,78 @@
+# Landing tests shared by the game and the server simulation. Both sweep the player's feet from
+# where they were last tick to where they are now, so a fast fall, a super jump or a slow tick
+# cannot carry the feet past a platform top between two steps.
+
+_profiles = {}  # mask -> (tops, bottoms), one entry per column
+_landing_tables = {}  # (player mask, platform mask) -> (first offset, rest heights)
+
+
+def crosses(previous_bottom, bottom, top):
+    # Feet were on or above the top edge last step and are on or below it now
+    return previous_bottom <= top <= bottom
+
+
+def overlaps(left, right, other_left, other_right):
+    return left <= other_right and other_left <= right
+
+
+def lands_on(previous_bottom, bottom, left, right, top, top_left, top_right):
+    return crosses(previous_bottom, bottom, top) and overlaps(left, right, top_left, top_right)
+
+
+def column_profiles(mask):
+    # Per column: y of the highest set pixel and y just below the lowest one, None for empty columns.
+    # Landing only depends on these two contours, not on the rest of the mask.
+    profiles = _profiles.get(mask)
+    if profiles is None:
+        width, height = mask.get_size()
+        tops = []
+        bottoms = []
+        for x in range(width):
+            column = [y for y in range(height) if mask.get_at((x, y))]
+            tops.append(column[0] if column else None)
+            bottoms.append(column[-1] + 1 if column else None)
+        profiles = _profiles[mask] = (tops, bottoms)
+    return profiles
+
+
+def landing_table(mask, platform_mask):
+    # For every horizontal offset (player x - platform x), the player y relative to the platform
+    # at which the first column of the feet touches the platform's top contour
+    key = (mask, platform_mask)
+    table = _landing_tables.get(key)
+    if table is None:
+        bottoms = column_profiles(mask)[1]
+        tops = column_profiles(platform_mask)[0]
+        first_offset = 1 - len(bottoms)
+        rests = []
+        for offset in range(first_offset, len(tops)):
+            rest = None
+            for x, bottom in enumerate(bottoms):
+                if bottom is None or not 0 <= x + offset < len(tops) or tops[x + offset] is None:
+                    continue
+                y = tops[x + offset] - bottom
+                if rest is None or y < rest:
+                    rest = y
+            rests.append(rest)
+        table = _landing_tables[key] = (first_offset, rests)
+    return table
+
+
+def prepare(masks, platform_masks):
+    # Builds every table up front so the first landing on each platform type costs nothing extra
+    for mask in masks:
+        for platform_mask in platform_masks:
+            if mask is not None and platform_mask is not None:
+                landing_table(mask, platform_mask)
+
+
+def landing_y(previous_y, rect, mask, platform_rect, platform_mask):
+    # rect.y that rests the feet on the platform if they reached its top contour this step, else None
+    first_offset, rests = landing_table(mask, platform_mask)
+    index = rect.x - platform_rect.x - first_offset
+    if not 0 <= index < len(rests) or rests[index] is None:
+        return None
+    y = platform_rect.y + rests[index]
+    if previous_y <= y <= rect.y:
+        return y
+    return None
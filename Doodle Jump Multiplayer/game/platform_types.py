@@ -0,0 +1,73 @@
+import itertools
+import random
+
+# Every platform type in one table, indexed by integer type id. The game loop looks a platform's
+# type up once and reads what to do from it, so adding a type adds a row here instead of another
+# branch to every frame.
+
+# Type ids
+NORMAL = 0
+BREAKABLE = 1
+FLY = 2
+MOVING = 3
+DANGER = 4
+SUPER_JUMP = 5
+
+moving_speed = 2
+
+
+def start_moving(platform):
+    platform.direction = random.choice([-1, 1])  # Start moving left or right randomly
+    platform.speed = moving_speed
+
+
+def move_sideways(platform, width):
+    platform.rect.x += platform.direction * platform.speed
+    if platform.rect.left <= 0:
+        platform.rect.left = 0
+        platform.direction = 1  # Move right
+    elif platform.rect.right >= width:
+        platform.rect.right = width
+        platform.direction = -1  # Move left
+
+
+class PlatformType:
+    def __init__(self, type_id, name, sprite, row_weight=0.0, spawn_weight=0.0, score=0,
+                 jump_scale=1, breaks=False, flies=False, deadly=False, on_spawn=None, update=None):
+        self.type_id = type_id
+        self.name = name
+        self.sprite = sprite
+        self.row_weight = row_weight  # Chance weight when filling the rows of a new level
+        self.spawn_weight = spawn_weight  # Chance weight for platforms added while climbing
+        self.score = score  # Points for landing on it
+        self.jump_scale = jump_scale  # Bounce is jump_strength times this
+        self.breaks = breaks  # Removed after one landing
+        self.flies = flies  # Landing starts the fly effect
+        self.deadly = deadly  # Touching it anywhere ends the run
+        self.on_spawn = on_spawn  # Called with the new platform
+        self.update = update  # Called with (platform, playfield width) every frame
+
+
+types = [
+    PlatformType(NORMAL, 'normal', 'PlatNorm.png', row_weight=0.60, spawn_weight=0.60, score=1),
+    PlatformType(BREAKABLE, 'breakable', 'BreakPlat.png', row_weight=0.10, spawn_weight=0.10, score=1, breaks=True),
+    PlatformType(FLY, 'fly', 'FlyPlat.png', row_weight=0.07, spawn_weight=0.07, score=10, flies=True),
+    PlatformType(MOVING, 'moving', 'MovePlat.png', spawn_weight=0.20, score=2, on_spawn=start_moving, update=move_sideways),
+    PlatformType(DANGER, 'danger', 'DangerPlat.png', row_weight=0.05, spawn_weight=0.05, deadly=True),
+    PlatformType(SUPER_JUMP, 'superJump', 'SuperJumpPlat.png', row_weight=0.5, score=5, jump_scale=2),
+]
+by_name = {platform_type.name: platform_type for platform_type in types}
+
+# Weighted choice tables, built once instead of per call
+row_type_ids = [platform_type.type_id for platform_type in types if platform_type.row_weight]
+row_cum_weights = list(itertools.accumulate(types[type_id].row_weight for type_id in row_type_ids))
+spawn_type_ids = [platform_type.type_id for platform_type in types if platform_type.spawn_weight]
+spawn_cum_weights = list(itertools.accumulate(types[type_id].spawn_weight for type_id in spawn_type_ids))
+
+
+def random_row_type(rng=random):
+    return rng.choices(row_type_ids, cum_weights=row_cum_weights)[0]
+
+
+def random_spawn_type(rng=random):
+    return rng.choices(spawn_type_ids, cum_weights=spawn_cum_weights)[0]
@@ -0,0 +1,38 @@
+import pygame
+
+
+class PlatformPool:
+    # Retired platforms keep their Rect and wait here to become the next spawn, so a long climb
+    # stops allocating once the pool holds a screen's worth of platforms
+    def __init__(self, platform_class):
+        self.platform_class = platform_class  # Built with (rect, type id), recycled with reset(type id)
+        self.free = []
+        self.hits = 0  # Spawns served from the pool
+        self.misses = 0  # Spawns that had to allocate
+
+    def acquire(self, x, y, width, height, type_id):
+        if self.free:
+            self.hits += 1
+            platform = self.free.pop()
+            platform.rect.update(x, y, width, height)
+            platform.reset(type_id)
+            return platform
+        self.misses += 1
+        return self.platform_class(pygame.Rect(x, y, width, height), type_id)
+
+    def release(self, platform):
+        self.free.append(platform)
+
+    def release_all(self, platforms):
+        self.free.extend(platforms)
+        platforms.clear()
+
+    def hit_rate(self):
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+    def summary(self):
+        return (
+            f"Platform pool: {self.hits} reused, {self.misses} allocated, "
+            f"{self.hit_rate():.0%} hit rate, {len(self.free)} free"
+        )
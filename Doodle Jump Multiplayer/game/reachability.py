@@ -0,0 +1,116 @@
+import math
+
+import platform_types
+
+# Jump-arc envelopes and a reachability check for generated platforms. An arc is stepped exactly
+# like the game (dy += gravity, then y += dy, once per frame); for every height the feet can land
+# at on the way down it records how far the player can move sideways before getting there.
+gravity = 0.2
+jump_strength = 9
+super_jump_strength = jump_strength * 2
+move_speed = 3  # Horizontal pixels per frame while a key is held
+rise_margin = 8  # Pixels kept free below the apex; the game rounds positions to whole pixels
+max_drop = 450  # Lowest landing below takeoff the tables cover, one playfield
+
+
+class JumpArc:
+    def __init__(self, strength, gravity=gravity, speed=move_speed, max_drop=max_drop):
+        # reach[rise + max_drop] = sideways pixels available to land rise pixels above takeoff
+        rise = 0.0
+        dy = -strength
+        frame = 0
+        apex = 0.0
+        reach = {}
+        while rise > -max_drop:
+            frame += 1
+            previous_rise = rise
+            dy += gravity
+            rise -= dy
+            apex = max(apex, rise)
+            if dy > 0:
+                for height in range(math.ceil(rise), math.floor(previous_rise) + 1):
+                    reach.setdefault(height, speed * frame)  # First crossing on the way down
+        self.max_rise = int(apex) - rise_margin
+        self.max_drop = max_drop
+        self.reach = [reach.get(height, 0) for height in range(-max_drop, self.max_rise + 1)]
+
+    def reach_at(self, rise):
+        # Sideways distance coverable when landing rise pixels higher (negative: lower); -1 if out of reach
+        if rise > self.max_rise:
+            return -1
+        return self.reach[max(rise, -self.max_drop) + self.max_drop]
+
+
+normal_arc = JumpArc(jump_strength)
+super_arc = JumpArc(super_jump_strength)
+
+
+def arc_for(type_id):
+    return super_arc if platform_types.types[type_id].jump_scale > 1 else normal_arc
+
+
+def horizontal_gap(x, other_x, platform_width, field_width):
+    # Pixels between two platforms' spans, going whichever way round the wrapping playfield is shorter
+    distance = abs(x - other_x) % field_width
+    distance = min(distance, field_width - distance)
+    return max(0, distance - platform_width)
+
+
+def can_reach(source, target, platform_width, field_width):
+    # source, target: (x, y, type id) with screen y (smaller is higher)
+    x, y, type_id = source
+    target_x, target_y, target_type = target
+    if platform_types.types[type_id].deadly:
+        return False
+    reach = arc_for(type_id).reach_at(y - target_y)
+    if reach < 0:
+        return False
+    if platform_types.types[type_id].update is not None or platform_types.types[target_type].update is not None:
+        return True  # Moving platforms sweep the whole width
+    return horizontal_gap(x, target_x, platform_width, field_width) <= reach
+
+
+def step_towards(x, target_x, distance, field_width):
+    # x moved up to distance pixels along the shorter way round to target_x
+    offset = (target_x - x) % field_width
+    if offset > field_width / 2:
+        offset -= field_width
+    offset = max(-distance, min(distance, offset))
+    return int(x + offset) % field_width
+
+
+def patch_layout(layout, platform_width, field_width):
+    # Walks the layout bottom to top and inserts normal platforms wherever the next platform up could
+    # not be reached from anything below it. Returns the patched layout; an empty layout stays empty.
+    ordered = sorted(layout, key=lambda platform: -platform[1])
+    patched = []
+    stepping = []  # Platforms the player can stand on so far, lowest first
+    for platform in ordered:
+        if platform_types.types[platform[2]].deadly:
+            patched.append(platform)  # Hazards need not be reachable
+            continue
+        # Only the last few footholds can matter; anything lower is further away than they are
+        if stepping and not any(can_reach(source, platform, platform_width, field_width) for source in stepping[-8:]):
+            source = stepping[-1]
+            safe_rise = normal_arc.max_rise * 2 // 3
+            while not can_reach(source, platform, platform_width, field_width):
+                x, y, type_id = source
+                rise = min(safe_rise, y - platform[1])
+                stone_x = step_towards(x, platform[0], normal_arc.reach_at(rise) // 2, field_width)
+                stone_x = min(stone_x, field_width - platform_width)
+                source = (stone_x, y - rise, platform_types.NORMAL)
+                patched.append(source)
+                stepping.append(source)
+        patched.append(platform)
+        stepping.append(platform)
+    return patched
+
+
+def reachable_spawn_x(x, source, rise, platform_width, field_width):
+    # Runtime spawner: x for a platform rise pixels above source, moved in until it can be reached
+    reach = arc_for(source.type_id).reach_at(rise)
+    if reach < 0 or platform_types.types[source.type_id].deadly:
+        return x  # Nothing to pull towards; generation keeps gaps inside the arc
+    if horizontal_gap(x, source.rect.x, platform_width, field_width) <= reach:
+        return x
+    return min(step_towards(source.rect.x, x, reach + platform_width, field_width), field_width - platform_width)
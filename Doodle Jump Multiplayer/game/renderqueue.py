@@ -0,0 +1,44 @@
+import operator
+
+# Draw layers, back to front. Blits within a layer are grouped by image, so their relative order is
+# not kept; anything that has to cover something else goes in a later layer.
+BACKDROP = 0
+STATIC = 1
+PLAYER = 2
+SPRITES = 3
+HUD = 4
+
+_draw_order = operator.itemgetter(0, 1)  # (layer, image id)
+
+
+class RenderQueue:
+    # A frame's blits for one target surface, collected during drawing and handed to pygame in a
+    # single Surface.blits call. Anything that would land entirely outside the target is dropped on
+    # the way in. Each viewport gets its own queue.
+    def __init__(self, target):
+        self.target = target
+        self.width, self.height = target.get_size()
+        self.draws = []  # (layer, image id, image, destination)
+        self.frames = 0
+        self.submitted = 0  # Blits handed to pygame
+        self.culled = 0  # Blits dropped as off-screen
+
+    def add(self, image, position, layer):
+        # position: a top-left point or a Rect whose top-left is used, as with Surface.blit.
+        # Kept as given and compared by hand, so queueing a blit builds no Rect.
+        x, y = position[0], position[1]
+        if x < self.width and y < self.height and x + image.get_width() > 0 and y + image.get_height() > 0:
+            self.draws.append((layer, id(image), image, position))
+        else:
+            self.culled += 1
+
+    def submit(self):
+        self.draws.sort(key=_draw_order)
+        self.target.blits([(image, position) for layer, image_id, image, position in self.draws], False)
+        self.frames += 1
+        self.submitted += len(self.draws)
+        self.draws.clear()
+
+    def summary(self):
+        per_frame = self.submitted / self.frames if self.frames else 0.0
+        return f"Render queue: {per_frame:.1f} blits per frame over {self.frames} frames, {self.culled} culled"
@@ -1,78 +1,543 @@
+import collections
+import itertools
 import socket
+import sys
 import threading
+import time
+
+import metrics
+import simulation
+import transport
+from interest import InterestFilter
 
 host_pc = '192.168.1.196'
 port = 59215
-clients = []
-max_clients = 2  # The game starts when exactly 2 clients are connected
+spectator_port = 59216  # Watch-only connections, any number
+max_clients = 2  # A room starts when exactly this many clients are connected
+rooms = {}  # room id -> Room
+room_ids = itertools.count()
+rooms_lock = threading.Lock()
+simulations = None  # SimulationPool when the server runs the physics (--simulate)
 
-# Initial player positions
-players = {
-    0: {'x': 100, 'y': 300},  # Player 1
-    1: {'x': 150, 'y': 300}   # Player 2
-}
+# Outbound budget per client
+max_queued_messages = 64  # Events waiting to be written before a client counts as over budget
+queue_limit = 256  # Hard cap: a client whose queue reaches it is disconnected at once
+slow_client_timeout = 2.0  # Seconds a client may stay over budget before it is disconnected
+budget_check_interval = 0.5  # How often the watchdog looks at clients that receive nothing new
+max_iovecs = 512  # Buffers handed to one sendmsg call, kept under the platform's IOV_MAX
+open_connections = set()  # Every ClientConnection not yet closed, for the budget watchdog
+open_connections_lock = threading.Lock()
+watchdog_started = False
 
-def handle_client(client_socket, address, player_id):
-    global clients, players
-    try:
-        # Notify other clients of the new connection
-        for c in clients:
-            c.send(f"CONNECTED:{address[1]}".encode())
+def encode(message):
+    return memoryview((message + "\n").encode())
+
+def send_buffers(sock, buffers):
+    # Scatter-gather write of shared buffers, without joining them into a new bytes object
+    if not hasattr(sock, "sendmsg"):
+        sock.sendall(b"".join(buffers))
+        return
+    while buffers:
+        sent = sock.sendmsg(buffers[:max_iovecs])
+        while buffers and sent >= len(buffers[0]):
+            sent -= len(buffers[0])
+            buffers.pop(0)
+        if sent:
+            buffers[0] = buffers[0][sent:]
+
+def watch_budgets():
+    # A stalled client blocks its writer thread in send and may get no new messages, so neither of
+    # them would ever notice it staying over budget
+    while True:
+        time.sleep(budget_check_interval)
+        with open_connections_lock:
+            connections = list(open_connections)
+        for connection in connections:
+            with connection.condition:
+                connection.check_budget()
+
+def start_watchdog():
+    global watchdog_started
+    with open_connections_lock:
+        if watchdog_started:
+            return
+        watchdog_started = True
+    threading.Thread(target=watch_budgets, daemon=True).start()
+
+def newest_fields(messages, kind, count):
+    # Integer fields of the newest well-formed "<kind>:<n>:..." message; malformed ones are skipped
+    for message in reversed(messages):
+        fields = message.split(":")
+        if fields[0] != kind or len(fields) != count + 1:
+            continue
+        try:
+            return [int(field) for field in fields[1:]]
+        except ValueError:
+            continue
+    return None
+
+def next_player_id(taken):
+    player_id = 0
+    while player_id in taken:
+        player_id += 1
+    return player_id
+
+class ClientConnection:
+    # Each client gets its own writer thread, so a slow reader only delays itself
+    def __init__(self, client_socket, address, player_id):
+        self.socket = client_socket
+        self.address = address
+        self.player_id = player_id
+        # Everything waiting to be written, in the order it was queued. Events get a key of their own;
+        # a position update replaces the queued one for the same player and moves to the back.
+        self.queue = collections.OrderedDict()
+        self.event_ids = itertools.count()
+        self.in_flight = 0  # Messages the writer has taken but not finished sending
+        self.condition = threading.Condition()
+        self.over_budget_since = None
+        self.closed = False
+        with open_connections_lock:
+            open_connections.add(self)
+        start_watchdog()
+        self.writer = threading.Thread(target=self.write_loop, daemon=True)
+        self.writer.start()
+
+    def send(self, message, key=None):
+        self.send_data(encode(message), key)
+
+    def send_data(self, data, key=None):
+        # data is an already encoded memoryview shared by every recipient
+        with self.condition:
+            if self.closed:
+                return
+            key = ('event', next(self.event_ids)) if key is None else ('update', key)
+            superseded = self.queue.pop(key, None) is not None
+            if not superseded and len(self.queue) >= queue_limit:
+                print(f"Disconnecting slow client {self.address}: send queue full")
+                self.close()
+                return
+            self.queue[key] = data
+            if not superseded:
+                metrics.send_queue_depth.inc()
+            self.check_budget()
+            self.condition.notify()
 
-        # Send initial position to the connected client
-        client_socket.send(f"INIT:{player_id}:{players[player_id]['x']}:{players[player_id]['y']}".encode())
+    def check_budget(self):
+        # Called with the condition held, on every send and from the watchdog
+        if self.closed:
+            return
+        if len(self.queue) + self.in_flight <= max_queued_messages:
+            self.over_budget_since = None
+        elif self.over_budget_since is None:
+            self.over_budget_since = time.monotonic()
+        elif time.monotonic() - self.over_budget_since > slow_client_timeout:
+            print(f"Disconnecting slow client {self.address}")
+            self.close()
 
-        # Keep the connection open to relay messages between clients
+    def write_loop(self):
         while True:
-            message = client_socket.recv(1024).decode()
-            if not message:
-                break
-
-            # Parse the message
-            if message.startswith("MOVE"):
-                _, x, y = message.split(":")
-                players[player_id] = {'x': int(x), 'y': int(y)}
-
-                # Broadcast the updated position to other clients
-                broadcast(f"UPDATE:{player_id}:{x}:{y}", client_socket)
-
-    except ConnectionResetError:
-        pass
-    finally:
-        # Remove client from the list when they disconnect
-        clients.remove(client_socket)
-        client_socket.close()
-        print(f"Connection closed from {address}")
-
-def broadcast(message, exclude_socket=None):
-    for client in clients:
-        if client != exclude_socket:
-            client.send(message.encode())
-
-def start_server():
+            with self.condition:
+                while not self.queue and not self.closed:
+                    self.condition.wait()
+                if self.closed:
+                    metrics.send_queue_depth.dec(len(self.queue))
+                    self.queue.clear()
+                    return
+                batch = list(self.queue.values())
+                self.queue.clear()
+                self.in_flight = len(batch)  # Still counts against the budget while send blocks
+            count = len(batch)
+            size = sum(len(data) for data in batch)
+            metrics.send_queue_depth.dec(count)
+            try:
+                send_buffers(self.socket, batch)
+                metrics.messages_out.inc(count)
+                metrics.bytes_out.inc(size)
+            except OSError:
+                self.close()
+                return
+            with self.condition:
+                self.in_flight = 0
+
+    def close(self):
+        with self.condition:
+            self.closed = True
+            self.condition.notify()
+        with open_connections_lock:
+            open_connections.discard(self)
+        try:
+            # Wakes the handler thread blocked in recv so it can clean up
+            self.socket.shutdown(socket.SHUT_RDWR)
+        except OSError:
+            pass
+
+class Room:
+    def __init__(self, room_id, on_close=None, on_change=None):
+        self.room_id = room_id
+        self.on_close = on_close  # Called once the last player has left
+        self.on_change = on_change  # Called after every join and leave
+        self.clients = []
+        self.spectators = []
+        self.started = False
+        self.closed = False
+        self.ready = set()  # Players back in the lobby waiting for the next round
+        self.lock = threading.Lock()
+        self.interest = InterestFilter()  # Drops or thins position updates between players far apart
+
+        # Initial player positions
+        self.players = {
+            0: {'x': 100, 'y': 300},  # Player 1
+            1: {'x': 150, 'y': 300}   # Player 2
+        }
+
+        # Physics runs in a worker process; this process only reads its snapshots
+        self.snapshots = simulations.add_room(room_id) if simulations else None
+        self.snapshots_lock = threading.Lock()
+        if self.snapshots:
+            metrics.simulated_rooms.inc()
+
+    def spawn_player(self, player_id):
+        # Players beyond the first two are spread across the width
+        return self.players.setdefault(player_id, {'x': 50 + (player_id * 50) % 200, 'y': 300})
+
+    def is_open(self):
+        return not self.started and not self.closed
+
+    def join(self, client_socket, address):
+        with self.lock:
+            player_id = next_player_id({c.player_id for c in self.clients})
+            connection = ClientConnection(client_socket, address, player_id)
+            self.clients.append(connection)
+            full = len(self.clients) == max_clients
+            if full:
+                self.started = True
+        print(f"Connection from {address} (room {self.room_id})")
+        metrics.connections_total.inc()
+        metrics.connections.inc()
+        if self.on_change:
+            self.on_change(self)
+
+        client_handler = threading.Thread(target=self.handle_client, args=(connection, player_id))
+        client_handler.start()
+        with self.snapshots_lock:  # remove_room may have just run on another thread
+            if self.snapshots:
+                simulations.join(self.room_id, player_id)
+
+        # Start the game when the room is full
+        if full:
+            print(f"{max_clients} clients connected. Starting the game in room {self.room_id}.")
+            self.broadcast("START")
+            if self.snapshots:
+                threading.Thread(target=self.publish_snapshots, daemon=True).start()
+
+    def player_ready(self, player_id):
+        # Clients keep their connection between rounds; the next one starts once everyone is back
+        with self.lock:
+            self.ready.add(player_id)
+            everyone = len(self.clients) == max_clients and self.ready >= {c.player_id for c in self.clients}
+            if everyone:
+                self.ready.clear()
+        if everyone:
+            print(f"Starting the next round in room {self.room_id}.")
+            self.broadcast("START")
+
+    def publish_snapshots(self):
+        # Relays simulated positions; never waits on the simulation, only samples the newest tick
+        interval = 1.0 / simulation.tick_rate
+        while not self.closed:
+            time.sleep(interval)
+            with self.snapshots_lock:
+                snapshot = self.snapshots.read_new() if self.snapshots else None
+            if snapshot is None:
+                continue
+            metrics.tick_seconds.observe(snapshot[2])
+            for player_id, x, y in snapshot[1]:
+                self.players[player_id] = {'x': int(x), 'y': int(y)}
+                self.broadcast_position(player_id, int(x), int(y))
+
+    def watch(self, spectator_socket, address):
+        connection = ClientConnection(spectator_socket, address, None)
+        self.spectators.append(connection)
+        print(f"Spectator from {address} (room {self.room_id})")
+        threading.Thread(target=self.handle_spectator, args=(connection,), daemon=True).start()
+
+    def handle_client(self, connection, player_id):
+        client_socket = connection.socket
+        address = connection.address
+        try:
+            # Notify other clients of the new connection
+            self.broadcast(f"CONNECTED:{address[1]}")
+
+            # Send initial position to the connected client
+            position = self.spawn_player(player_id)
+            connection.send(f"INIT:{player_id}:{position['x']}:{position['y']}")
+
+            # Keep the connection open to relay messages between clients
+            buffer = ""
+            while True:
+                data = client_socket.recv(1024).decode()
+                if not data:
+                    break
+                metrics.bytes_in.inc(len(data))
+
+                # Messages are newline terminated; several may arrive in one read
+                buffer += data
+                *messages, buffer = buffer.split("\n")
+                metrics.messages_in.inc(len(messages))
+                if "READY" in messages:
+                    self.player_ready(player_id)
+
+                if self.snapshots:
+                    # Server-side physics: positions come from the simulation, which only needs INPUT:<-1|0|1>
+                    fields = newest_fields(messages, "INPUT", 1)
+                    if fields:
+                        with self.snapshots_lock:
+                            if self.snapshots:
+                                simulations.send_input(self.room_id, player_id, max(-1, min(1, fields[0])))
+                    continue
+
+                fields = newest_fields(messages, "MOVE", 2)
+                if fields:
+                    # Only the newest position matters
+                    x, y = fields
+                    self.players[player_id] = {'x': x, 'y': y}
+
+                    # Broadcast the updated position to the clients that can see it
+                    self.broadcast_position(player_id, x, y, connection)
+
+        except (ConnectionResetError, OSError):
+            pass
+        finally:
+            # Remove client from the list when they disconnect
+            with self.lock:
+                self.clients.remove(connection)
+                empty = not self.clients
+                if empty:
+                    self.closed = True
+            self.interest.forget(player_id)
+            connection.close()
+            client_socket.close()
+            print(f"Connection closed from {address}")
+            metrics.connections.dec()
+            with self.snapshots_lock:
+                if self.snapshots:
+                    simulations.leave(self.room_id, player_id)
+            if self.on_change:
+                self.on_change(self)
+            if empty:
+                with self.snapshots_lock:
+                    if self.snapshots:
+                        simulations.remove_room(self.room_id)
+                        self.snapshots = None
+                        metrics.simulated_rooms.dec()
+                for spectator in list(self.spectators):
+                    spectator.close()
+                if self.on_close:
+                    self.on_close(self)
+
+    def broadcast(self, message, exclude=None, key=None):
+        # Encoded once and shared; the per-client writer threads do the blocking sends
+        started = time.perf_counter()
+        data = encode(message)
+        for client in list(self.clients):
+            if client is not exclude:
+                client.send_data(data, key)
+        for spectator in list(self.spectators):
+            spectator.send_data(data, key)
+        metrics.broadcast_seconds.observe(time.perf_counter() - started)
+
+    def broadcast_position(self, player_id, x, y, exclude=None):
+        started = time.perf_counter()
+        count = self.interest.next_update(player_id)
+        data = encode(f"UPDATE:{player_id}:{x}:{y}")
+        for client in list(self.clients):
+            if client is exclude:
+                continue
+            receiver_y = self.spawn_player(client.player_id)['y']
+            if self.interest.should_send(count, client.player_id, int(y), receiver_y):
+                client.send_data(data, player_id)
+
+        # Spectators see the whole room
+        for spectator in list(self.spectators):
+            spectator.send_data(data, player_id)
+        metrics.broadcast_seconds.observe(time.perf_counter() - started)
+
+    def handle_spectator(self, connection):
+        try:
+            for player_id, position in list(self.players.items()):
+                connection.send(f"UPDATE:{player_id}:{position['x']}:{position['y']}", player_id)
+            # Spectators never send anything; reading only detects the disconnect
+            while connection.socket.recv(1024):
+                pass
+        except OSError:
+            pass
+        finally:
+            self.spectators.remove(connection)
+            connection.close()
+            connection.socket.close()
+            print(f"Spectator left {connection.address}")
+
+def open_room():
+    # The room that still waits for players, or a fresh one
+    with rooms_lock:
+        for room in rooms.values():
+            if room.is_open():
+                return room
+        room = Room(next(room_ids), on_close=close_room)
+        rooms[room.room_id] = room
+        metrics.rooms.inc()
+        return room
+
+def close_room(room):
+    with rooms_lock:
+        if rooms.pop(room.room_id, None):
+            metrics.rooms.dec()
+
+def newest_room():
+    with rooms_lock:
+        return rooms[max(rooms)] if rooms else None
+
+def listen(address, backlog, reuse_port=False):
     server_socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-    server_socket.bind((host_pc, port))
-    server_socket.listen(max_clients)
+    server_socket.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    if reuse_port:
+        # Several worker processes bind the same port and the kernel spreads connections
+        server_socket.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEPORT, 1)
+    server_socket.bind(address)
+    server_socket.listen(backlog)
+    return server_socket
+
+def accept_spectators(reuse_port=False):
+    server_socket = listen((host_pc, spectator_port), 16, reuse_port)
+    while True:
+        spectator_socket, address = server_socket.accept()
+        room = newest_room()
+        if room is None:
+            spectator_socket.close()
+            continue
+        room.watch(spectator_socket, address)
+
+def start_metrics(metrics_port=metrics.metrics_port, label=''):
+    # Every process keeps its own counters, so each one serves them on its own port
+    try:
+        metrics.start_http_server(port=metrics_port)
+    except OSError as e:
+        print(f"Metrics endpoint not started on port {metrics_port}: {e}")
+    metrics.start_log_thread(label=label)
+
+def start_server(reuse_port=False, metrics_port=metrics.metrics_port, label=''):
+    server_socket = listen((host_pc, port), max_clients, reuse_port)
+    threading.Thread(target=accept_spectators, args=(reuse_port,), daemon=True).start()
+    start_metrics(metrics_port, label)
     print("Server started, waiting for connections...")
 
-    player_id = 0
     while True:
-        if len(clients) < max_clients:
-            client_socket, address = server_socket.accept()
-            clients.append(client_socket)
-            print(f"Connection from {address}")
-
-            client_handler = threading.Thread(target=handle_client, args=(client_socket, address, player_id))
-            client_handler.start()
-
-            # Start the game when 2 clients have connected
-            if len(clients) == max_clients:
-                print("Two clients connected. Starting the game.")
-                for c in clients:
-                    c.send("START".encode())
-                player_id = 1
-        else:
-            pass
+        client_socket, address = server_socket.accept()
+        open_room().join(client_socket, address)
+
+def start_udp_server():
+    # Positions go out as unreliable snapshots, lobby and game events over the reliable channel
+    server_socket = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    server_socket.bind((host_pc, port))
+    server_socket.settimeout(transport.resend_interval)
+    start_metrics()
+    print("UDP server started, waiting for connections...")
+
+    room = Room(0)  # Holds positions and interest state; the channels replace its connections
+    metrics.rooms.inc()
+    channels = {}  # address -> UdpChannel
+    player_ids = {}  # address -> player id
+    while True:
+        try:
+            packet, address = server_socket.recvfrom(transport.max_packet)
+        except socket.timeout:
+            packet = None
+        except ConnectionResetError:
+            continue  # ICMP port unreachable from a client that went away
+
+        if packet is not None:
+            metrics.bytes_in.inc(len(packet))
+            channel = channels.get(address)
+            if channel is None:
+                # Only a HELLO opens a channel, so stray datagrams cannot take a player slot
+                if len(channels) >= max_clients or not transport.is_hello(packet):
+                    continue
+                channel = transport.UdpChannel(server_socket, address)
+                channels[address] = channel
+            for payload in channel.receive(packet):
+                metrics.messages_in.inc()
+                handle_udp_message(room, payload.decode(errors='replace').strip(), address, channels, player_ids)
+
+        now = time.monotonic()
+        for address, channel in list(channels.items()):
+            channel.resend_due(now)
+            # Updates are never acked, so a peer that vanished without BYE only shows up as silence
+            if channel.failed or channel.idle(now):
+                drop_udp_client(room, address, channels, player_ids)
+
+def udp_send(channel, message):
+    channel.send(message)
+    metrics.messages_out.inc()
+    metrics.bytes_out.inc(transport.header.size + len(message))
+
+def handle_udp_message(room, message, address, channels, player_ids):
+    if message == "HELLO":
+        if address in player_ids:
+            return
+        player_id = next_player_id(set(player_ids.values()))
+        player_ids[address] = player_id
+        print(f"Connection from {address}")
+        metrics.connections_total.inc()
+        metrics.connections.inc()
+
+        for other_address, channel in channels.items():
+            if other_address != address:
+                udp_send(channel, f"CONNECTED:{address[1]}")
+        position = room.spawn_player(player_id)
+        udp_send(channels[address], f"INIT:{player_id}:{position['x']}:{position['y']}")
+
+        if len(player_ids) == max_clients:
+            print(f"{max_clients} clients connected. Starting the game.")
+            for channel in channels.values():
+                udp_send(channel, "START")
+    elif message == "READY" and address in player_ids:
+        room.ready.add(player_ids[address])
+        if len(player_ids) == max_clients and room.ready >= set(player_ids.values()):
+            room.ready.clear()
+            for channel in channels.values():
+                udp_send(channel, "START")
+    elif message == "BYE":
+        drop_udp_client(room, address, channels, player_ids)
+    elif message.startswith("MOVE") and address in player_ids:
+        player_id = player_ids[address]
+        try:
+            _, x, y = message.split(":")
+            x, y = int(x), int(y)
+        except ValueError:
+            return  # Malformed; one bad packet must not stop the server
+        room.players[player_id] = {'x': x, 'y': y}
+        started = time.perf_counter()
+        count = room.interest.next_update(player_id)
+        for other_address, channel in channels.items():
+            other_id = player_ids.get(other_address)
+            if other_id is None or other_address == address:
+                continue
+            if room.interest.should_send(count, other_id, y, room.spawn_player(other_id)['y']):
+                udp_send(channel, f"UPDATE:{player_id}:{x}:{y}")
+        metrics.broadcast_seconds.observe(time.perf_counter() - started)
+
+def drop_udp_client(room, address, channels, player_ids):
+    channels.pop(address, None)
+    player_id = player_ids.pop(address, None)
+    if player_id is not None:
+        room.interest.forget(player_id)
+        metrics.connections.dec()
+    print(f"Connection closed from {address}")
 
 if __name__ == "__main__":
-    start_server()
+    if "--simulate" in sys.argv:
+        simulations = simulation.SimulationPool()
+    if "--udp" in sys.argv:
+        start_udp_server()
+    else:
+        start_server()
@@ -0,0 +1,186 @@
+import pygame
+import socket
+import threading
+
+import assets
+import main
+import transport
+from persistence import get_persistence
+from viewport import window_exposed
+
+WINDOW_WIDTH = 800
+WINDOW_HEIGHT = 600
+FONT_SIZE = 24
+FONT_COLOR = (0, 0, 0)
+OTHER_PLAYER_TINT = (255, 140, 140, 255)  # Remote doodlers are drawn reddish
+
+# Posted by the network thread so the lobby can sleep in pygame.event.wait
+LOBBY_MESSAGE = pygame.USEREVENT + 1
+MATCH_START = pygame.USEREVENT + 2
+DISCONNECTED = pygame.USEREVENT + 3
+
+
+class Session:
+    # One connection, window and set of loaded images for the whole visit: lobby, match, lobby, ...
+    def __init__(self, server_ip, server_port, use_udp=False):
+        pygame.init()
+        pygame.font.init()
+        self.screen = pygame.display.set_mode((WINDOW_WIDTH, WINDOW_HEIGHT))
+        pygame.display.set_caption("Doodle Jump")
+        self.font = pygame.font.SysFont(None, FONT_SIZE)
+        self.text_cache = {}  # text -> rendered surface
+
+        # Loaded once; every round reuses them and the game's own window setup
+        main.setup(self.screen)
+        self.other_player_image = assets.player_image()[0].copy()
+        self.other_player_image.fill(OTHER_PLAYER_TINT, special_flags=pygame.BLEND_RGBA_MULT)
+
+        self.messages = []
+        self.connected = True
+        self.player_id = None
+        self.start_position = (100, 300)
+        self.other_players = {}  # player id -> [x, world height], written by the network thread
+        self.input_dx = None  # Last direction sent as INPUT; None sends the next one regardless
+
+        if use_udp:
+            self.socket = transport.UdpClient()
+        else:
+            self.socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        self.socket.connect((server_ip, server_port))
+
+        self.receiver = threading.Thread(target=self.receive_messages, daemon=True)
+        self.receiver.start()
+
+    def post(self, event_type, **attributes):
+        try:
+            pygame.event.post(pygame.event.Event(event_type, **attributes))
+        except pygame.error:
+            pass  # The window is already gone
+
+    def receive_messages(self):
+        # Runs for the whole session; positions are stored directly, everything else becomes an event
+        buffer = ""
+        try:
+            while True:
+                data = self.socket.recv(1024).decode(errors='replace')
+                if not data:
+                    break
+
+                # Messages are newline terminated; one read may hold several or part of one
+                buffer += data
+                *lines, buffer = buffer.split("\n")
+                for message in lines:
+                    try:
+                        self.handle_message(message)
+                    except ValueError:
+                        continue  # Malformed; one bad message must not end the session
+        except (ConnectionResetError, OSError):
+            pass
+        finally:
+            self.post(DISCONNECTED)  # Whatever stopped this thread, the screens must not wait on it
+
+    def handle_message(self, message):
+        if message.startswith("CONNECTED:"):
+            self.post(LOBBY_MESSAGE, text=f"Connected to: {message.split(':')[1]}")
+        elif message == "START":
+            self.post(MATCH_START)
+        elif message.startswith("INIT:"):
+            _, player_id, x, y = message.split(":")
+            self.player_id, self.start_position = int(player_id), (int(x), int(y))
+        elif message.startswith("UPDATE:"):
+            _, player_id, x, y = message.split(":")
+            if int(player_id) != self.player_id:
+                self.other_players[int(player_id)] = [int(x), int(y)]
+        else:
+            self.post(LOBBY_MESSAGE, text=message)
+
+    def draw_text(self, text, x, y):
+        surface = self.text_cache.get(text)
+        if surface is None:
+            surface = self.text_cache[text] = self.font.render(text, True, FONT_COLOR)
+        rect = surface.get_rect(center=(x, y))
+        self.screen.blit(surface, rect)
+
+    def draw_lobby(self):
+        self.screen.fill((0, 255, 0))  # Green background
+        self.draw_text("Game Lobby", WINDOW_WIDTH // 2, 50)
+
+        y = 100
+        for message in self.messages:
+            self.draw_text(message, WINDOW_WIDTH // 2, y)
+            y += 30
+
+        pygame.display.flip()
+
+    def run_lobby(self):
+        # Sleeps until something happens and only redraws when the screen changed.
+        # Returns True when a match starts, False when the player quits.
+        pygame.event.set_blocked(pygame.MOUSEMOTION)
+        self.draw_lobby()
+        try:
+            while True:
+                event = pygame.event.wait()
+                if event.type == pygame.QUIT:
+                    return False
+                elif event.type == MATCH_START:
+                    return True
+                elif event.type == LOBBY_MESSAGE:
+                    self.messages.append(event.text)
+                    self.draw_lobby()
+                elif event.type == DISCONNECTED:
+                    self.connected = False
+                    self.messages.append("Disconnected from server")
+                    self.draw_lobby()
+                elif event.type in (window_exposed, pygame.VIDEORESIZE):
+                    self.draw_lobby()
+        finally:
+            pygame.event.set_allowed(pygame.MOUSEMOTION)
+
+    def handle_match_event(self, event):
+        # Network events reaching the game loop; True when the connection is gone
+        if event.type == DISCONNECTED:
+            self.connected = False
+            self.messages.append("Disconnected from server")
+            return True
+        if event.type == LOBBY_MESSAGE:
+            self.messages.append(event.text)  # Shown when the lobby comes back
+        return False
+
+    def send(self, message):
+        if self.connected:
+            try:
+                self.socket.send(f"{message}\n".encode())
+            except OSError:
+                self.connected = False  # The receive thread reports the disconnect
+
+    def send_move(self, x, y):
+        self.send(f"MOVE:{x}:{y}")
+
+    def send_input(self, dx):
+        # For servers running the physics (--simulate); only changes of direction are sent
+        if dx != self.input_dx:
+            self.input_dx = dx
+            self.send(f"INPUT:{dx}")
+
+    def run_match(self):
+        # The real game loop from main.py on this session's window and connection.
+        # Returns True to go back to the lobby, False when the window is closed.
+        self.input_dx = None
+        back_to_lobby = main.play(self)
+        if main.game_over:
+            self.messages.append(f"Game over with {main.score} points")
+        if back_to_lobby and self.connected:
+            self.messages.append("Waiting for the next round")
+            self.send("READY")
+        return back_to_lobby
+
+    def run(self):
+        while self.run_lobby():
+            if not self.run_match():
+                break
+        self.close()
+
+    def close(self):
+        self.socket.close()
+        get_persistence().stop()  # Flushes the scores of every round
+        pygame.quit()
@@ -0,0 +1,210 @@
+import multiprocessing
+import queue
+import random
+import struct
+import sys
+import time
+from multiprocessing import resource_tracker, shared_memory
+
+import physics
+
+# Same playfield and physics as main.py
+width, height = 250, 450
+platform_width, platform_height = 50, 50
+player_size = 50
+gravity = 0.2
+jump_strength = 9
+player_speed = 3
+vertical_spacing = 80
+
+tick_rate = 60  # Simulation steps per second
+max_players = 16  # Snapshot slots per room
+
+# Shared snapshot layout: header, then one fixed-size entry per player slot.
+# seq is a seqlock counter: odd while the worker is writing, even when the snapshot is stable.
+snapshot_header = struct.Struct('<QQIf')  # seq, tick, player count, tick duration in seconds
+snapshot_entry = struct.Struct('<iff')  # player id, x, world height
+snapshot_size = snapshot_header.size + snapshot_entry.size * max_players
+
+
+class RoomSimulation:
+    def __init__(self, seed):
+        self.random = random.Random(seed)
+        self.tick = 0
+        self.players = {}  # player id -> [x, y, dy, dx]
+        self.platforms = []  # (x, y) in world coordinates, y grows downwards like the screen
+        self.top = height
+        self.extend_platforms(-height)
+
+    def extend_platforms(self, target_y):
+        while self.top > target_y:
+            self.top -= vertical_spacing
+            self.platforms.append((self.random.randint(0, width - platform_width), self.top))
+
+    def add_player(self, player_id):
+        x, y = self.platforms[0] if self.platforms else (width // 2, height)
+        self.players[player_id] = [x, y - player_size, 0.0, 0]
+
+    def remove_player(self, player_id):
+        self.players.pop(player_id, None)
+
+    def set_input(self, player_id, dx):
+        if player_id in self.players:
+            self.players[player_id][3] = dx
+
+    def step(self):
+        self.tick += 1
+        for player in self.players.values():
+            player[0] = (player[0] + player[3] * player_speed) % width  # Horizontal wraparound
+            previous_bottom = player[1] + player_size
+            player[2] += gravity
+            player[1] += player[2]
+            bottom = player[1] + player_size
+            if player[2] > 0:
+                for x, y in self.platforms:
+                    if physics.lands_on(previous_bottom, bottom, player[0], player[0] + player_size, y, x, x + platform_width):
+                        player[1] = y - player_size
+                        player[2] = -jump_strength
+                        break
+        if self.players:
+            self.extend_platforms(min(player[1] for player in self.players.values()) - height)
+            lowest = max(player[1] for player in self.players.values()) + height
+            self.platforms = [platform for platform in self.platforms if platform[1] <= lowest]
+
+    def write_snapshot(self, buffer, tick_seconds=0.0):
+        seq = snapshot_header.unpack_from(buffer)[0]
+        snapshot_header.pack_into(buffer, 0, seq + 1, self.tick, 0, tick_seconds)  # Odd: readers retry
+        count = 0
+        for player_id, player in list(self.players.items())[:max_players]:
+            snapshot_entry.pack_into(buffer, snapshot_header.size + count * snapshot_entry.size, player_id, player[0], player[1])
+            count += 1
+        snapshot_header.pack_into(buffer, 0, seq + 2, self.tick, count, tick_seconds)
+
+
+def attach_shared_memory(name):
+    # The creating process owns the segment; attaching must not register it for cleanup again
+    if sys.version_info >= (3, 13):
+        return shared_memory.SharedMemory(name=name, track=False)
+    memory = shared_memory.SharedMemory(name=name)
+    resource_tracker.unregister(memory._name, 'shared_memory')
+    return memory
+
+
+def run_simulations(commands, tick_rate=tick_rate):
+    # Worker process: steps every room it owns and publishes snapshots into shared memory
+    rooms = {}  # room id -> (RoomSimulation, SharedMemory)
+    interval = 1.0 / tick_rate
+    next_tick = time.monotonic()
+    while True:
+        while True:
+            try:
+                command = commands.get(timeout=max(0.0, next_tick - time.monotonic()))
+            except queue.Empty:
+                break
+            if command is None:
+                for simulation, memory in rooms.values():
+                    memory.close()
+                return
+            kind, room_id, *args = command
+            if kind == 'add':
+                memory = attach_shared_memory(args[0])
+                rooms[room_id] = (RoomSimulation(args[1]), memory)
+            elif kind == 'remove':
+                simulation, memory = rooms.pop(room_id, (None, None))
+                if memory is not None:
+                    memory.close()
+            elif room_id in rooms:
+                simulation = rooms[room_id][0]
+                if kind == 'join':
+                    simulation.add_player(args[0])
+                elif kind == 'leave':
+                    simulation.remove_player(args[0])
+                elif kind == 'input':
+                    simulation.set_input(args[0], args[1])
+            if time.monotonic() >= next_tick:
+                break
+
+        for simulation, memory in rooms.values():
+            started = time.perf_counter()
+            simulation.step()
+            simulation.write_snapshot(memory.buf, time.perf_counter() - started)
+        next_tick += interval
+        if next_tick < time.monotonic():
+            next_tick = time.monotonic()  # Fell behind; skip ahead instead of bursting
+
+
+class SnapshotReader:
+    # Network side view of one room's snapshot; reads straight out of shared memory
+    def __init__(self, memory, retries=100):
+        self.memory = memory
+        self.retries = retries  # Attempts before settling for the last stable snapshot
+        self.last_tick = 0
+        self.last_snapshot = (0, [], 0.0)
+
+    def read(self):
+        buffer = self.memory.buf
+        for _ in range(self.retries):
+            seq, tick, count, tick_seconds = snapshot_header.unpack_from(buffer)
+            if not seq % 2:
+                entries = [
+                    snapshot_entry.unpack_from(buffer, snapshot_header.size + index * snapshot_entry.size)
+                    for index in range(count)
+                ]
+                if snapshot_header.unpack_from(buffer)[0] == seq:
+                    self.last_snapshot = tick, entries, tick_seconds
+                    return self.last_snapshot
+            time.sleep(0)  # The worker is mid-write; let it finish instead of spinning
+        # A worker that died mid-write leaves seq odd for good
+        return self.last_snapshot
+
+    def read_new(self):
+        # None when the worker has not published a newer tick since the last call
+        tick, entries, tick_seconds = self.read()
+        if tick == self.last_tick:
+            return None
+        self.last_tick = tick
+        return tick, entries, tick_seconds
+
+
+class SimulationPool:
+    def __init__(self, workers=None):
+        workers = workers or multiprocessing.cpu_count()
+        self.queues = [multiprocessing.Queue() for _ in range(workers)]
+        self.processes = [
+            multiprocessing.Process(target=run_simulations, args=(commands,), daemon=True)
+            for commands in self.queues
+        ]
+        for process in self.processes:
+            process.start()
+        self.rooms = {}  # room id -> (worker queue, SharedMemory)
+
+    def add_room(self, room_id, seed=None):
+        memory = shared_memory.SharedMemory(create=True, size=snapshot_size)
+        memory.buf[:snapshot_size] = bytes(snapshot_size)
+        commands = self.queues[room_id % len(self.queues)]
+        commands.put(('add', room_id, memory.name, seed if seed is not None else room_id))
+        self.rooms[room_id] = (commands, memory)
+        return SnapshotReader(memory)
+
+    def remove_room(self, room_id):
+        commands, memory = self.rooms.pop(room_id)
+        commands.put(('remove', room_id))
+        memory.close()
+        memory.unlink()
+
+    def join(self, room_id, player_id):
+        self.rooms[room_id][0].put(('join', room_id, player_id))
+
+    def leave(self, room_id, player_id):
+        self.rooms[room_id][0].put(('leave', room_id, player_id))
+
+    def send_input(self, room_id, player_id, dx):
+        self.rooms[room_id][0].put(('input', room_id, player_id, dx))
+
+    def close(self):
+        for commands in self.queues:
+            commands.put(None)
+        for process in self.processes:
+            process.join(1.0)
+        for room_id in list(self.rooms):
+            self.remove_room(room_id)
@@ -0,0 +1,71 @@
+import pygame
+
+import platform_types
+import renderqueue
+
+transparent = (255, 0, 255)  # Colour key for strip pixels no platform covers; sprite alpha is all-or-nothing
+
+
+def is_static(platform):
+    # Platforms without a per-frame update only move when the screen scrolls
+    return platform_types.types[platform.type_id].update is None
+
+
+class StripCache:
+    # Static platforms drawn once onto full-width strips laid out in world coordinates (screen y minus
+    # the total scroll), so scrolling only moves where the strips are blitted. A frame costs the
+    # backdrop, the two to four strips on screen and the moving platforms, however many platforms
+    # there are. A strip is redrawn only after a platform in it is added or removed.
+    def __init__(self, size, backdrop, strip_height=150):
+        self.width, self.height = size
+        self.backdrop = backdrop  # Screen-fixed fill and background image, already composited
+        self.strip_height = strip_height
+        self.offset = 0  # Pixels scrolled since the last clear
+        self.strips = {}  # Strip index -> surface; strip k covers world y k * strip_height and down
+        self.rebuilds = 0
+
+    def clear(self):
+        self.strips.clear()
+        self.offset = 0
+
+    def scroll(self, amount):
+        self.offset += amount
+        # Strips that fell below the screen are never shown again
+        for index in [index for index in self.strips if index * self.strip_height + self.offset >= self.height]:
+            del self.strips[index]
+
+    def strip_range(self, top, bottom):
+        # Indexes of the strips touching screen rows top to bottom - 1
+        return range((top - self.offset) // self.strip_height, (bottom - 1 - self.offset) // self.strip_height + 1)
+
+    def invalidate(self, platform):
+        # Call when a static platform appears or goes away; its strips are redrawn when next shown
+        if is_static(platform):
+            top = platform.rect.y
+            for index in self.strip_range(top, top + platform.image.get_height()):
+                self.strips.pop(index, None)
+
+    def build(self, index, platforms):
+        self.rebuilds += 1
+        strip = pygame.Surface((self.width, self.strip_height)).convert()
+        strip.fill(transparent)
+        strip_top = index * self.strip_height + self.offset  # Screen y of the strip right now
+        for platform in platforms:
+            if is_static(platform):
+                y = platform.rect.y - strip_top
+                if y < self.strip_height and y + platform.image.get_height() > 0:
+                    strip.blit(platform.image, (platform.rect.x, y))
+        strip.set_colorkey(transparent, pygame.RLEACCEL)
+        return strip
+
+    def draw(self, queue, platforms):
+        # Queues the backdrop and static platforms; moving platforms are still queued one by one
+        queue.add(self.backdrop, (0, 0), renderqueue.BACKDROP)
+        for index in self.strip_range(0, self.height):
+            strip = self.strips.get(index)
+            if strip is None:
+                strip = self.strips[index] = self.build(index, platforms)
+            queue.add(strip, (0, index * self.strip_height + self.offset), renderqueue.STATIC)
+
+    def summary(self):
+        return f"Strip cache: {self.rebuilds} strips drawn"
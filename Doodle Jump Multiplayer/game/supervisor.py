@@ -0,0 +1,220 @@
+import multiprocessing
+import os
+import socket
+import sys
+import threading
+
+import metrics
+import server
+
+worker_count = os.cpu_count() or 1
+
+
+def worker_metrics_port(index):
+    # Worker n serves its own counters one port above base + n; the base port is the single-process server's
+    return metrics.metrics_port + 1 + index
+
+
+def run_worker(control, index):
+    # Rooms live entirely inside one worker; the supervisor hands over accepted sockets.
+    # Every join and leave is reported back as PLAYERS:<room>:<players>:<joins handled>:<started>.
+    rooms = {}
+    closed_rooms = set()  # Never reopened; late joins for them go back to the supervisor
+    joins = {}  # room id -> JOIN handovers handled
+    control_lock = threading.Lock()
+    server.start_metrics(worker_metrics_port(index), f"worker {index} ")
+
+    def report(message, fds=()):
+        with control_lock:
+            socket.send_fds(control, [message.encode()], list(fds))
+
+    def report_players(room_id):
+        room = rooms.get(room_id)
+        players, started = (len(room.clients), int(room.started)) if room else (0, 0)
+        report(f"PLAYERS:{room_id}:{players}:{joins.get(room_id, 0)}:{started}")
+
+    def room_changed(room):
+        report_players(room.room_id)
+
+    def room_closed(room):
+        closed_rooms.add(room.room_id)
+        rooms.pop(room.room_id, None)
+        joins.pop(room.room_id, None)
+        metrics.rooms.dec()
+        report(f"CLOSED:{room.room_id}")
+
+    while True:
+        message, fds, _, _ = socket.recv_fds(control, 1024, 1)
+        if not message:
+            break
+        kind, room_id = message.decode().split(":")
+        room_id = int(room_id)
+        client_socket = socket.socket(fileno=fds[0])
+
+        room = rooms.get(room_id)
+        if room_id in closed_rooms or (room is not None and room.closed):
+            # The supervisor matched this player before it heard the room close
+            if kind == "JOIN":
+                report(f"REQUEUE:{room_id}", [client_socket.fileno()])
+            client_socket.close()
+            continue
+        if kind == "JOIN":
+            joins[room_id] = joins.get(room_id, 0) + 1  # Counted even if it fails, so its place is freed
+        try:
+            address = client_socket.getpeername()
+            if room is None:
+                room = rooms[room_id] = server.Room(room_id, on_close=room_closed, on_change=room_changed)
+                metrics.rooms.inc()
+            if kind == "JOIN":
+                room.join(client_socket, address)
+            else:
+                room.watch(client_socket, address)
+        except OSError:
+            # Reset before it was taken over; only this client is lost
+            client_socket.close()
+            if kind == "JOIN":
+                report_players(room_id)
+
+
+class Supervisor:
+    def __init__(self, workers=worker_count):
+        self.lock = threading.Lock()
+        self.controls = [None] * workers
+        self.processes = [None] * workers
+        self.room_load = [0] * workers  # Open rooms per worker
+        self.room_workers = {}  # room id -> worker index
+        self.room_ids = 0
+        self.filling_room = None  # Room id currently collecting players
+        self.filling_count = 0  # Players in it, counting those still being handed over
+        self.filling_assigned = 0  # Players ever matched to it
+        self.newest_room = None
+
+        for index in range(workers):
+            self.start_worker(index)
+
+    def start_worker(self, index):
+        # SOCK_SEQPACKET keeps one handed-over socket per message
+        parent, child = socket.socketpair(socket.AF_UNIX, socket.SOCK_SEQPACKET)
+        process = multiprocessing.Process(target=run_worker, args=(child, index), daemon=True)
+        process.start()
+        child.close()
+        self.controls[index] = parent
+        self.processes[index] = process
+        threading.Thread(target=self.read_control, args=(index, parent), daemon=True).start()
+
+    def worker_died(self, index, control):
+        # Its rooms went with it; a fresh worker takes the slot so matching carries on
+        with self.lock:
+            if self.controls[index] is not control:
+                return  # Already replaced
+            print(f"Worker {index} exited, starting a new one")
+            for room_id in [room_id for room_id, worker in self.room_workers.items() if worker == index]:
+                del self.room_workers[room_id]
+                if self.filling_room == room_id:
+                    self.filling_room = None
+            self.room_load[index] = 0
+            control.close()
+            self.start_worker(index)
+
+    def read_control(self, index, control):
+        while True:
+            try:
+                message, fds, _, _ = socket.recv_fds(control, 1024, 1)
+            except OSError:
+                message = b''
+            if not message:
+                self.worker_died(index, control)
+                return
+            kind, room_id, *counts = message.decode().split(":")
+            room_id = int(room_id)
+            if kind == "PLAYERS":
+                players, joins, started = map(int, counts)
+                with self.lock:
+                    if self.filling_room == room_id:
+                        if started:
+                            self.filling_room = None  # Rooms never take players once they have started
+                        else:
+                            # Players who left free their places; matched ones still on the way keep theirs
+                            self.filling_count = players + self.filling_assigned - joins
+            elif kind == "CLOSED":
+                with self.lock:
+                    self.room_workers.pop(room_id, None)
+                    self.room_load[index] -= 1
+                    if self.filling_room == room_id:
+                        self.filling_room = None
+            elif kind == "REQUEUE":
+                # A join that raced the room's close; match the player again
+                client_socket = socket.socket(fileno=fds[0])
+                room_id, worker = self.match()
+                self.hand_over("JOIN", client_socket, room_id, worker)
+
+    def match(self):
+        # Matchmaking across workers: fill one room at a time, new rooms go to the least loaded worker
+        with self.lock:
+            if self.filling_room is None or self.filling_count >= server.max_clients:
+                index = self.room_load.index(min(self.room_load))
+                self.filling_room = self.room_ids
+                self.room_ids += 1
+                self.filling_count = 0
+                self.filling_assigned = 0
+                self.room_load[index] += 1
+                self.room_workers[self.filling_room] = index
+                self.newest_room = self.filling_room
+            self.filling_count += 1
+            self.filling_assigned += 1
+            return self.filling_room, self.room_workers[self.filling_room]
+
+    def hand_over(self, kind, client_socket, room_id, index, retries=1):
+        control = self.controls[index]
+        try:
+            socket.send_fds(control, [f"{kind}:{room_id}".encode()], [client_socket.fileno()])
+        except OSError:
+            # The worker is gone with its rooms; a player is matched again, a spectator is dropped
+            self.worker_died(index, control)
+            if kind == "JOIN" and retries:
+                room_id, index = self.match()
+                self.hand_over(kind, client_socket, room_id, index, retries - 1)
+                return
+        client_socket.close()  # The worker holds its own copy now
+
+    def accept_spectators(self):
+        server_socket = server.listen((server.host_pc, server.spectator_port), 16)
+        while True:
+            spectator_socket, address = server_socket.accept()
+            with self.lock:
+                room_id = self.newest_room
+                index = self.room_workers.get(room_id)
+            if index is None:
+                spectator_socket.close()
+                continue
+            self.hand_over("WATCH", spectator_socket, room_id, index)
+
+    def serve(self):
+        server_socket = server.listen((server.host_pc, server.port), 128)
+        threading.Thread(target=self.accept_spectators, daemon=True).start()
+        print(f"Supervisor started with {len(self.processes)} workers, waiting for connections...")
+        while True:
+            client_socket, address = server_socket.accept()
+            room_id, index = self.match()
+            self.hand_over("JOIN", client_socket, room_id, index)
+
+
+def start_reuseport_workers(workers=worker_count):
+    # Every worker accepts on the shared port; rooms form within a worker only
+    processes = [
+        multiprocessing.Process(target=server.start_server, kwargs={
+            "reuse_port": True, "metrics_port": worker_metrics_port(index), "label": f"worker {index} "
+        })
+        for index in range(workers)
+    ]
+    for process in processes:
+        process.start()
+    for process in processes:
+        process.join()
+
+
+if __name__ == "__main__":
+    if "--reuseport" in sys.argv:
+        start_reuseport_workers()
+    else:
+        Supervisor().serve()
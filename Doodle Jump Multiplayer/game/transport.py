@@ -0,0 +1,183 @@
+import socket
+import struct
+import threading
+import time
+
+# Packet kinds
+SNAPSHOT = 0  # Unreliable, newest wins (positions)
+RELIABLE = 1  # Acked, retransmitted and delivered in order (lobby and game events)
+ACK = 2
+KEEPALIVE = 3  # Carries nothing; only tells the other side this peer is still there
+
+header = struct.Struct('!BI')  # kind, sequence number
+max_packet = 1400
+resend_interval = 0.1  # Seconds before an unacked reliable packet is sent again
+max_resends = 50  # Give up on a peer after this many retries of the same packet
+keepalive_interval = 2.0  # Seconds of silence before a keepalive goes out
+idle_timeout = 10.0  # Seconds without hearing from a peer before the server drops it
+
+snapshot_prefixes = ('MOVE', 'UPDATE')
+
+
+def is_snapshot(message):
+    return message.startswith(snapshot_prefixes)
+
+
+def is_hello(packet):
+    # The first packet of every client; the server opens channels for nothing else
+    return len(packet) > header.size and header.unpack_from(packet)[0] == RELIABLE and packet[header.size:] == b'HELLO'
+
+
+def seq_newer(a, b):
+    # Wraparound-safe "a comes after b" for 32-bit sequence numbers
+    return a != b and ((a - b) & 0xFFFFFFFF) < 0x80000000
+
+
+class UdpChannel:
+    def __init__(self, sock, address):
+        self.sock = sock
+        self.address = address
+        self.lock = threading.Lock()
+        self.snapshot_seq = 0
+        self.last_snapshot_in = None
+        self.reliable_seq = 0
+        self.next_reliable_in = 1
+        self.pending = {}  # seq -> [packet, last_sent, resends]
+        self.out_of_order = {}  # seq -> payload, held until the gap is filled
+        self.last_heard = time.monotonic()
+        self.last_sent = self.last_heard
+        self.failed = False
+
+    def send(self, message):
+        if is_snapshot(message):
+            self.send_snapshot(message.encode())
+        else:
+            self.send_reliable(message.encode())
+
+    def send_snapshot(self, payload):
+        with self.lock:
+            self.snapshot_seq = (self.snapshot_seq + 1) & 0xFFFFFFFF
+            packet = header.pack(SNAPSHOT, self.snapshot_seq) + payload
+            self.last_sent = time.monotonic()
+        self.sock.sendto(packet, self.address)
+
+    def send_reliable(self, payload):
+        with self.lock:
+            self.reliable_seq = (self.reliable_seq + 1) & 0xFFFFFFFF
+            packet = header.pack(RELIABLE, self.reliable_seq) + payload
+            self.last_sent = time.monotonic()
+            self.pending[self.reliable_seq] = [packet, self.last_sent, 0]
+        self.sock.sendto(packet, self.address)
+
+    def receive(self, packet):
+        # Returns the payloads that are ready for the application, in order
+        if len(packet) < header.size:
+            return []
+        kind, seq = header.unpack_from(packet)
+        payload = packet[header.size:]
+        self.last_heard = time.monotonic()
+
+        if kind == ACK:
+            with self.lock:
+                self.pending.pop(seq, None)
+            return []
+
+        if kind == KEEPALIVE:
+            return []
+
+        if kind == SNAPSHOT:
+            with self.lock:
+                if self.last_snapshot_in is not None and not seq_newer(seq, self.last_snapshot_in):
+                    return []  # Stale or duplicate position, a newer one already arrived
+                self.last_snapshot_in = seq
+            return [payload]
+
+        # Reliable: always ack, even duplicates, in case the first ack was lost
+        self.sock.sendto(header.pack(ACK, seq), self.address)
+        ready = []
+        with self.lock:
+            if seq == self.next_reliable_in:
+                ready.append(payload)
+                self.next_reliable_in = (self.next_reliable_in + 1) & 0xFFFFFFFF
+                while self.next_reliable_in in self.out_of_order:
+                    ready.append(self.out_of_order.pop(self.next_reliable_in))
+                    self.next_reliable_in = (self.next_reliable_in + 1) & 0xFFFFFFFF
+            elif seq_newer(seq, self.next_reliable_in):
+                self.out_of_order[seq] = payload
+        return ready
+
+    def resend_due(self, now=None):
+        now = time.monotonic() if now is None else now
+        due = []
+        with self.lock:
+            for entry in self.pending.values():
+                if now - entry[1] >= resend_interval:
+                    entry[1] = now
+                    entry[2] += 1
+                    if entry[2] > max_resends:
+                        self.failed = True
+                    due.append(entry[0])
+        for packet in due:
+            self.sock.sendto(packet, self.address)
+
+    def keepalive_due(self, now=None):
+        # Keeps a quiet peer (a client waiting in the lobby) from being timed out as idle
+        now = time.monotonic() if now is None else now
+        if now - self.last_sent >= keepalive_interval:
+            self.last_sent = now
+            self.sock.sendto(header.pack(KEEPALIVE, 0), self.address)
+
+    def idle(self, now=None):
+        now = time.monotonic() if now is None else now
+        return now - self.last_heard > idle_timeout
+
+
+class UdpClient:
+    # Socket-like wrapper so the lobby and game loops can use UDP unchanged
+    def __init__(self):
+        self.sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self.sock.settimeout(resend_interval)
+        self.channel = None
+        self.inbox = []
+        self.closed = False
+
+    def connect(self, address):
+        host, port = address
+        self.channel = UdpChannel(self.sock, (socket.gethostbyname(host), port))
+        self.channel.send('HELLO')
+
+    def send(self, data):
+        self.channel.send(data.decode())
+        return len(data)
+
+    def recv(self, bufsize):
+        # Blocks until a message is delivered; retransmits while waiting
+        while not self.inbox:
+            if self.closed:
+                return b''
+            try:
+                packet, address = self.sock.recvfrom(max_packet)
+            except socket.timeout:
+                self.channel.resend_due()
+                self.channel.keepalive_due()
+                if self.channel.failed:
+                    raise ConnectionResetError('server stopped acknowledging')
+                continue
+            except OSError:
+                return b''
+            if address == self.channel.address:
+                self.inbox.extend(self.channel.receive(packet))
+            self.channel.resend_due()
+            self.channel.keepalive_due()
+        # Newline framed like the TCP stream, so readers can share one parser
+        return self.inbox.pop(0)[:bufsize - 1] + b'\n'
+
+    def close(self):
+        if self.closed:
+            return
+        self.closed = True
+        try:
+            self.channel.send('BYE')  # Best effort, the server also drops peers that stop acking
+        except OSError:
+            pass
+        self.sock.close()
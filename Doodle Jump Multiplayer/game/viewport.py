@@ -0,0 +1,41 @@
+import pygame
+
+border_color = (0, 0, 0)  # Bars around the playfield when the window has another aspect ratio
+window_exposed = getattr(pygame, 'WINDOWEXPOSED', pygame.VIDEOEXPOSE)  # pygame 1.9 only has VIDEOEXPOSE
+
+
+class Viewport:
+    # The game always draws into one fixed-size surface; the window shows it scaled once per frame,
+    # so resizing only changes the scale instead of the world
+    def __init__(self, size, window=None):
+        # window: an existing display surface to draw into instead of opening a new resizable one
+        self.size = size
+        self.window = window if window is not None else pygame.display.set_mode(size, pygame.RESIZABLE)
+        self.surface = pygame.Surface(size).convert()
+        self.scaled = None  # Reused scale target, rebuilt only when the window size changes
+        self.area = pygame.Rect((0, 0), size)
+        self.resize(self.window.get_size())
+
+    def resize(self, window_size):
+        self.window = pygame.display.get_surface()
+        scale = min(window_size[0] / self.size[0], window_size[1] / self.size[1])
+        scaled_size = (max(1, round(self.size[0] * scale)), max(1, round(self.size[1] * scale)))
+        self.area = pygame.Rect((0, 0), scaled_size)
+        self.area.center = (window_size[0] // 2, window_size[1] // 2)
+        self.scaled = None if scaled_size == self.size else pygame.Surface(scaled_size).convert()
+        self.window.fill(border_color)
+
+    def present(self):
+        if self.scaled is None:
+            self.window.blit(self.surface, self.area)
+        else:
+            pygame.transform.scale(self.surface, self.area.size, self.scaled)
+            self.window.blit(self.scaled, self.area)
+        pygame.display.flip()
+
+    def to_logical(self, position):
+        # Window pixel -> playfield coordinates, for mouse input
+        return (
+            (position[0] - self.area.x) * self.size[0] // self.area.width,
+            (position[1] - self.area.y) * self.size[1] // self.area.height
+        )